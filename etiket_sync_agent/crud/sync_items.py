@@ -4,9 +4,11 @@ from typing import List, Optional, Tuple, Dict
 from datetime import datetime, timedelta, timezone
 
 from sqlalchemy.orm import Session
-from sqlalchemy import select, insert, update, or_
+from sqlalchemy import select, update, or_, bindparam
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 from etiket_sync_agent.models.sync_items import SyncItems
+from etiket_sync_agent.models.utility.functions import utcnow
 
 class SyncItemSortKey(enum.StrEnum):
     id = "id"
@@ -18,80 +20,66 @@ class OrderDirection(enum.StrEnum):
     asc = "asc"
     desc = "desc"
     
+# statements of read_next_sync_item, built once, the values are passed as bound parameters.
+# keep the predicate order : the selective (indexed) source/synchronized filters first, the retry expression last.
+_NEXT_ITEM_STMT = (
+    select(SyncItems)
+    .where(SyncItems.sync_source_id == bindparam("sync_source_id"))
+    .where(SyncItems.synchronized == False)
+    .where(SyncItems.attempts == 0)
+    .order_by(SyncItems.syncPriority.desc())
+    .limit(1)
+    .offset(bindparam("offset"))
+)
+
+# retry rules : the n-th attempt is retried when the last update is older than the delay (5 or more attempts : 1 day)
+_RETRY_DELAYS = {1 : timedelta(minutes=20), 2 : timedelta(hours=1), 3 : timedelta(hours=2), 4 : timedelta(hours=8), 5 : timedelta(days=1)}
+
+_NEXT_RETRY_ITEM_STMT = (
+    select(SyncItems)
+    .where(SyncItems.sync_source_id == bindparam("sync_source_id"))
+    .where(SyncItems.synchronized == False)
+    .where(or_((SyncItems.attempts == 0),
+            (SyncItems.attempts == 1) & (SyncItems.last_update < bindparam("retry_cutoff_1")),
+            (SyncItems.attempts == 2) & (SyncItems.last_update < bindparam("retry_cutoff_2")),
+            (SyncItems.attempts == 3) & (SyncItems.last_update < bindparam("retry_cutoff_3")),
+            (SyncItems.attempts == 4) & (SyncItems.last_update < bindparam("retry_cutoff_4")),
+            (SyncItems.attempts >= 5) & (SyncItems.last_update < bindparam("retry_cutoff_5"))))
+    .order_by(SyncItems.attempts.asc(), SyncItems.syncPriority.desc())
+    .limit(1)
+    .offset(bindparam("offset"))
+)
+
 class SyncItemsCrud:
     def create_sync_items(self, session : Session, sync_source_id : int, sync_items : List[SyncItems]) -> None:
         # not exposed to the rest api
         if len(sync_items) == 0:
             return
-        existing_items_result = []
-        batch_size = 10000
         
-        for i in range(0, len(sync_items), batch_size):
-            batch = sync_items[i:i+batch_size]
-            data_identifiers_batch = [item.dataIdentifier for item in batch]
-            
-            stmt = select(SyncItems).where(SyncItems.sync_source_id == sync_source_id)
-            stmt = stmt.where(SyncItems.dataIdentifier.in_(data_identifiers_batch))
-
-            result = session.execute(stmt).scalars().all()
-            existing_items_result.extend(result)
+        rows = [{"sync_source_id" : sync_source_id,
+                    "dataIdentifier" : s_item.dataIdentifier,
+                    "datasetUUID" : s_item.datasetUUID if s_item.datasetUUID is not None else uuid.uuid4(),
+                    "syncPriority" : s_item.syncPriority} for s_item in sync_items]
         
-        existing_data_identifiers = {item.dataIdentifier : item for item in existing_items_result}
-        
-        create_list = []
-        update_list = []
-        
-        for s_item in sync_items:
-            if s_item.dataIdentifier in existing_data_identifiers:
-                update_list.append({"id" : existing_data_identifiers[s_item.dataIdentifier].id,
-                                    "syncPriority" : s_item.syncPriority,
-                                    "synchronized" : False,
-                                    "attempts" : 0})
-            else:
-                create_list.append({"sync_source_id" : sync_source_id,
-                                    "dataIdentifier" : s_item.dataIdentifier,
-                                    "datasetUUID" : s_item.datasetUUID if s_item.datasetUUID is not None else uuid.uuid4(),
-                                    "syncPriority" : s_item.syncPriority})
-        
-        if create_list:
-            session.execute(insert(SyncItems), create_list)
-        if update_list:
-            session.execute(update(SyncItems), update_list)
-
-        if create_list or update_list:
-            session.commit()
+        # items that are already present are reset, such that they are synchronized again (rows are applied in order, last one wins).
+        # note that onupdate values are not applied by ON CONFLICT DO UPDATE, hence last_update is set explicitly.
+        stmt = sqlite_insert(SyncItems.__table__)
+        stmt = stmt.on_conflict_do_update(index_elements=[SyncItems.sync_source_id, SyncItems.dataIdentifier],
+                                            set_={SyncItems.syncPriority : stmt.excluded.syncPriority,
+                                                    SyncItems.synchronized : False,
+                                                    SyncItems.attempts : 0,
+                                                    SyncItems.last_update : utcnow()})
+        session.execute(stmt, rows)
+        session.commit()
     
     def read_next_sync_item(self, session : Session, sync_source_id : int, offset :int) -> SyncItems | None:
-        select_stmt = (
-            select(SyncItems)
-            .where(SyncItems.sync_source_id == sync_source_id)
-            .where(SyncItems.synchronized == False)
-            .where(SyncItems.attempts == 0)
-            .order_by(SyncItems.syncPriority.desc())
-            .limit(1)
-            .offset(offset)
-        )
-        
-        result = session.execute(select_stmt).scalar_one_or_none()
+        params = {"sync_source_id" : sync_source_id, "offset" : offset}
+        result = session.execute(_NEXT_ITEM_STMT, params).scalar_one_or_none()
 
-        # retry rules : 1st attempt after 1 hour, 2nd attempt after 1 day, 3rd attempt after 1 week, 4th attempt after 1 month
         if result is None:
-            select_stmt = (
-                select(SyncItems)
-                .where(SyncItems.sync_source_id == sync_source_id)
-                .where(SyncItems.synchronized == False)
-                .where(or_((SyncItems.attempts == 0),
-                        (SyncItems.attempts == 1) & (SyncItems.last_update < datetime.now(timezone.utc) - timedelta(minutes=20)),
-                        (SyncItems.attempts == 2) & (SyncItems.last_update < datetime.now(timezone.utc) - timedelta(hours=1)),
-                        (SyncItems.attempts == 3) & (SyncItems.last_update < datetime.now(timezone.utc) - timedelta(hours=2)),
-                        (SyncItems.attempts == 4) & (SyncItems.last_update < datetime.now(timezone.utc) - timedelta(hours=8)),
-                        (SyncItems.attempts >= 5) & (SyncItems.last_update < datetime.now(timezone.utc) - timedelta(days=1))))
-                .order_by(SyncItems.attempts.asc(), SyncItems.syncPriority.desc())
-                .limit(1)
-                .offset(offset)
-            )
-
-            result = session.execute(select_stmt).scalar_one_or_none()
+            now = datetime.now(timezone.utc)
+            retry_params = {f"retry_cutoff_{attempt}" : now - delay for attempt, delay in _RETRY_DELAYS.items()}
+            result = session.execute(_NEXT_RETRY_ITEM_STMT, {**params, **retry_params}).scalar_one_or_none()
         
         if result is None:
             return None 
@@ -143,9 +131,8 @@ class SyncItemsCrud:
         session.execute(update_stmt)
         session.commit()
         
-        stmt = select(SyncItems).where(SyncItems.id == sync_item_id)
-        result = session.execute(stmt).scalar_one()
-        return result
+        # primary key lookup, reuses the instance from the identity map when it is already loaded
+        return session.get_one(SyncItems, sync_item_id)
     
     def get_last_sync_item(self, session : Session, sync_source_id : int) -> SyncItems | None:
         stmt = (
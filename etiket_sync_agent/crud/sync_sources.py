@@ -135,17 +135,7 @@ class CRUD_sync_sources:
         if source is None:
             raise SyncSourceNotFoundError(source_id=source_id)
 
-        # delete sync items first
-        stmt = delete(SyncItems).where(SyncItems.sync_source_id == source_id)
-        session.execute(stmt)
-        session.commit()
-
-        # delete sync source logs
-        stmt = delete(SyncSourceErrors).where(SyncSourceErrors.sync_source_id == source_id)
-        session.execute(stmt)
-        session.commit()
-
-        # delete sync source
+        # the sync items and logs are deleted by the database (ON DELETE CASCADE)
         stmt = (delete(SyncSources).where(SyncSources.id == source_id))
         session.execute(stmt)
         session.commit()
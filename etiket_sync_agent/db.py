@@ -4,7 +4,7 @@ import platformdirs as pd
 from pathlib import Path
 from typing import Generator, Optional
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, Session
 
 def __get_base_dir():
@@ -18,10 +18,19 @@ DATABASE_URL = f"sqlite+pysqlite:///{Path(__get_base_dir()) / 'sql' / 'sync_agen
 ENGINE = None
 SESSION_LOCAL: Optional[sessionmaker] = None
 
+def enable_foreign_keys(dbapi_connection, connection_record):
+    # sqlite only enforces foreign keys (and applies ON DELETE CASCADE) when this is set on the connection
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
 def load_engine():
     global ENGINE, SESSION_LOCAL
 
     db_engine = create_engine(DATABASE_URL)
+    # the migrations run on their own engine (see migrations/env.py), without this pragma, as the table rebuilds of sqlite
+    # do not work with foreign keys on.
+    event.listen(db_engine, "connect", enable_foreign_keys)
     session_local = sessionmaker(autocommit=False, autoflush=False, bind=db_engine)
 
     try:
@@ -0,0 +1,51 @@
+"""sync_source_cascade_delete
+
+Revision ID: b7e2d4c1a9f3
+Revises: 3f1c2a7d9b4e
+Create Date: 2026-10-16 14:05:12.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e2d4c1a9f3'
+down_revision: Union[str, None] = '3f1c2a7d9b4e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# the foreign keys were created without a name, sqlite requires a table rebuild (batch mode) to change them.
+naming_convention = {"fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s"}
+
+# the rebuild reflects the indexes, which loses the DESC of this one, it is recreated afterwards.
+def _drop_read_next_item_index() -> None:
+    op.drop_index('read_next_item_index', table_name='sync_items')
+
+def _create_read_next_item_index() -> None:
+    op.create_index('read_next_item_index', 'sync_items', ['sync_source_id', 'synchronized', 'attempts', sa.text('"syncPriority" DESC')], unique=False)
+
+
+def upgrade() -> None:
+    # deleting a source did not always remove its rows, the rebuild would copy them (foreign keys are not checked on the copy).
+    for table_name in ('sync_items', 'sync_source_errors'):
+        op.execute(f'DELETE FROM {table_name} WHERE sync_source_id NOT IN (SELECT id FROM sync_sources)')
+    _drop_read_next_item_index()
+    for table_name in ('sync_items', 'sync_source_errors'):
+        with op.batch_alter_table(table_name, naming_convention=naming_convention) as batch_op:
+            batch_op.drop_constraint(f'fk_{table_name}_sync_source_id_sync_sources', type_='foreignkey')
+            batch_op.create_foreign_key(f'fk_{table_name}_sync_source_id_sync_sources', 'sync_sources',
+                                        ['sync_source_id'], ['id'], ondelete='CASCADE')
+    _create_read_next_item_index()
+
+
+def downgrade() -> None:
+    _drop_read_next_item_index()
+    for table_name in ('sync_items', 'sync_source_errors'):
+        with op.batch_alter_table(table_name, naming_convention=naming_convention) as batch_op:
+            batch_op.drop_constraint(f'fk_{table_name}_sync_source_id_sync_sources', type_='foreignkey')
+            batch_op.create_foreign_key(f'fk_{table_name}_sync_source_id_sync_sources', 'sync_sources',
+                                        ['sync_source_id'], ['id'])
+    _create_read_next_item_index()
@@ -3,7 +3,7 @@ import uuid, typing
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import ForeignKey, UniqueConstraint, Index, types
+from sqlalchemy import ForeignKey, UniqueConstraint, Index, types, desc
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from etiket_sync_agent.models.base import Base
@@ -17,10 +17,10 @@ class SyncItems(Base):
     __tablename__  = "sync_items"
     
     __table_args__ = (UniqueConstraint('sync_source_id', 'dataIdentifier', name='sync_source_did_constraint_sync_items'),
-                        Index('read_item_index', 'sync_source_id', 'synchronized'),
-                        Index('failed_upload_index', 'sync_source_id', 'attempts'))
+                        Index('failed_upload_index', 'sync_source_id', 'attempts'),
+                        Index('read_next_item_index', 'sync_source_id', 'synchronized', 'attempts', desc('syncPriority')))
     id: Mapped[int] = mapped_column(primary_key=True)
-    sync_source_id : Mapped[int] = mapped_column(ForeignKey("sync_sources.id"))
+    sync_source_id : Mapped[int] = mapped_column(ForeignKey("sync_sources.id", ondelete="CASCADE"))
     dataIdentifier: Mapped[str] = mapped_column(index = True)
     datasetUUID  : Mapped[uuid.UUID] = mapped_column(unique=True)
     
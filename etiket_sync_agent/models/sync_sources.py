@@ -33,15 +33,16 @@ class SyncSources(Base):
     
     default_scope : Mapped[Optional[uuid.UUID]]
     
-    errors : Mapped[list["SyncSourceErrors"]] = relationship(cascade="all, delete-orphan")
+    # the database deletes the errors and items of a source (ON DELETE CASCADE), they are not loaded to delete them
+    errors : Mapped[list["SyncSourceErrors"]] = relationship(cascade="all, delete-orphan", passive_deletes=True)
     
-    sync_items : Mapped[list["SyncItems"]] = relationship(back_populates="sync_source")
+    sync_items : Mapped[list["SyncItems"]] = relationship(back_populates="sync_source", passive_deletes=True)
     
 class SyncSourceErrors(Base):
     __tablename__ = "sync_source_errors"
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    sync_source_id : Mapped[int] = mapped_column(ForeignKey("sync_sources.id"))
+    sync_source_id : Mapped[int] = mapped_column(ForeignKey("sync_sources.id", ondelete="CASCADE"))
     sync_iteration : Mapped[int]
     log_exception : Mapped[str]
     log_context   : Mapped[Optional[str]] = mapped_column(nullable=True)
@@ -114,9 +114,14 @@ def sync_loop(n_cycles : int = 0):
 
 def run_sync_iter(session_sync : Session, session_etiket : Session, sync_iteration: int):
     n_syncs = 0
-    sync_sources = crud_sync_sources.list_sync_sources(session_sync)
-    for sync_source in sync_sources:
-        print(f"Syncing {sync_source.name}")
+    sync_source_ids = [sync_source.id for sync_source in crud_sync_sources.list_sync_sources(session_sync)]
+    for sync_source_id in sync_source_ids:
+        # sources can be deleted while the iteration runs (the database then also removes their items and errors)
+        sync_source = session_sync.get(SyncSources, sync_source_id)
+        if sync_source is None:
+            continue
+        sync_source_name = sync_source.name
+        print(f"Syncing {sync_source_name}")
         if sync_source.status in (SyncSourceStatus.PAUSED, SyncSourceStatus.ERROR):
             continue
         
@@ -167,8 +172,13 @@ def run_sync_iter(session_sync : Session, session_etiket : Session, sync_iterati
         except CONNECTION_ERRORS as e:
             raise e
         except Exception as e:
-            logger.exception("Failed to sync %s", sync_source.name)
+            logger.exception("Failed to sync %s", sync_source_name)
             traceback_str = traceback.format_exc()
+            # a failed write (e.g. items of a source that was deleted in the meantime) leaves the transaction unusable
+            session_sync.rollback()
+            if session_sync.get(SyncSources, sync_source_id) is None:
+                logger.info("Sync source %s was deleted during the sync iteration, skipping it.", sync_source_name)
+                continue
             crud_sync_sources.add_sync_source_error(session_sync, sync_source.id, sync_iteration, log_exception=e, log_traceback=traceback_str)
             
             # update status to ERROR if 5 sequential errors are found.
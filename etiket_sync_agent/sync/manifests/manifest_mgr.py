@@ -11,7 +11,8 @@ logger = logging.getLogger(__name__)
 class manifest_manager:
     __manifest_contents = {}
     
-    def __init__(self, name : str, root_path : Optional[Path] = None, current_manifest : Optional[Dict[str, float]] = None,  level : int = -1, is_NFS : bool = False, is_single_file : bool = False):
+    def __init__(self, name : str, root_path : Optional[Path] = None, current_manifest : Optional[Dict[str, float]] = None,  level : int = -1, is_NFS : bool = False, is_single_file : bool = False,
+                    poll_interval : Optional[float] = None):
         '''
         initialise the manifest manager with the name of the dataset and the root path of the dataset.
         
@@ -21,6 +22,7 @@ class manifest_manager:
             current_manifest (Dict[str, float]) : the current manifest that contains the keys of the datasets and the last modified time of the dataset.
             level (int) : the depth of folders at which the datasets are stored. Default is 1.
             is_single_file (bool) : whether the dataset is a single file or a directory with files. Default is False.
+            poll_interval (float) : for NFS, the time in seconds between two datasets that are scanned. Default is the interval of the poller version used.
         '''
         self.name = name
         if name in self.__manifest_contents:
@@ -32,10 +34,12 @@ class manifest_manager:
             if root_path is None:
                 raise ValueError("Root path is required for V2 manifest manager")
             
+            # only passed when given, such that the states keep the default of their own poller
+            state_kwargs = {} if poll_interval is None else {"poll_interval": poll_interval}
             if level > 0:
-                self.state = ManifestStateV1(root_path, current_manifest, level, is_NFS=is_NFS, is_single_file=is_single_file)
+                self.state = ManifestStateV1(root_path, current_manifest, level, is_NFS=is_NFS, is_single_file=is_single_file, **state_kwargs)
             else:
-                self.state = ManifestStateV2(root_path, current_manifest, is_NFS=is_NFS)
+                self.state = ManifestStateV2(root_path, current_manifest, is_NFS=is_NFS, **state_kwargs)
             logger.debug("Initialized manifest manager for %s", name)
             self.__manifest_contents[name] = self.state
     
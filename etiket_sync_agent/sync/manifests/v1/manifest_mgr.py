@@ -7,7 +7,7 @@ from typing import Dict, Optional, Any, Union
 from pathlib import Path
 import os
 
-from etiket_sync_agent.sync.manifests.v1.dataset_poller_NFS import dataset_poller_NFS
+from etiket_sync_agent.sync.manifests.v1.dataset_poller_NFS import dataset_poller_NFS, POLLER_RATE_INTERVAL
 from etiket_sync_agent.sync.manifests.v1.dataset_poller_local import dataset_poller_local
 from etiket_sync_agent.sync.manifests.utility import dataset_get_mod_time
 
@@ -22,6 +22,7 @@ class ManifestStateV1:
     worker: Optional[Union[threading.Thread, Process]] = None
     stop_event: Optional[Any] = None
     local_observer: Optional[Any] = None
+    poll_interval: float = POLLER_RATE_INTERVAL
     
     def __post_init__(self):
         if self.is_NFS:
@@ -35,7 +36,7 @@ class ManifestStateV1:
         self.stop_event = Event()
         proc = Process(
             target=dataset_poller_NFS,
-            args=(self.root_path, current_manifest, self.update_queue, self.level, self.is_single_file, self.stop_event),
+            args=(self.root_path, current_manifest, self.update_queue, self.level, self.is_single_file, self.stop_event, self.poll_interval),
             daemon=True,
         )
         proc.start()
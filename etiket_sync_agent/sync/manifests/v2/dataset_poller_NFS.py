@@ -10,16 +10,18 @@ from etiket_sync_agent.sync.manifests.utility import enqueue_updates, dataset_ge
 
 POLLER_RATE_INTERVAL = 0.1
 
-def dataset_poller_NFS(root_path: Path, current_manifest : Dict[str, float], update_queue : Queue, stop_event: Optional[Event] = None):
+def dataset_poller_NFS(root_path: Path, current_manifest : Dict[str, float], update_queue : Queue, stop_event: Optional[Event] = None,
+                        poll_interval: float = POLLER_RATE_INTERVAL):
     """
     Poll function to find all new datasets that are not yet present in the current manifest, on a network file system.
     
     Since for the network file system we cannot make use of events, we need to manually find new datasets.
     In the background, this function will scan continuously scan for new datasets.
     As the scanning can take a while, it regularly does a check, based on the location of the most recent dataset, if a new one appeared in a nearby location.
+    The scans are rate limited to one dataset every poll_interval seconds.
     """
-    # rate limit to ~10 datasets/sec across full + quick scans
-    next_allowed = time.perf_counter() + POLLER_RATE_INTERVAL
+    # rate limit to ~10 datasets/sec across full + quick scans (default)
+    next_allowed = time.perf_counter() + poll_interval
     while stop_event is None or not stop_event.is_set():
         iterations_without_updates = 0
         
@@ -30,7 +32,7 @@ def dataset_poller_NFS(root_path: Path, current_manifest : Dict[str, float], upd
             now = time.perf_counter()
             if now < next_allowed:
                 time.sleep(next_allowed - now)
-            next_allowed = time.perf_counter() + POLLER_RATE_INTERVAL
+            next_allowed = time.perf_counter() + poll_interval
 
             if stop_event and stop_event.is_set():
                 return
@@ -41,7 +43,7 @@ def dataset_poller_NFS(root_path: Path, current_manifest : Dict[str, float], upd
                     now = time.perf_counter()
                     if now < next_allowed:
                         time.sleep(next_allowed - now)
-                    next_allowed = time.perf_counter() + POLLER_RATE_INTERVAL
+                    next_allowed = time.perf_counter() + poll_interval
                     if stop_event and stop_event.is_set():
                         return
                 iterations_without_updates = 0
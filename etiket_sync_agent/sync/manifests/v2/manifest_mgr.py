@@ -6,7 +6,7 @@ from dataclasses import dataclass, field
 from typing import Dict, Optional, Any, Union
 from pathlib import Path
 
-from etiket_sync_agent.sync.manifests.v2.dataset_poller_NFS import dataset_poller_NFS
+from etiket_sync_agent.sync.manifests.v2.dataset_poller_NFS import dataset_poller_NFS, POLLER_RATE_INTERVAL
 from etiket_sync_agent.sync.manifests.v2.dataset_puller_local import dataset_poller_local
 from etiket_sync_agent.sync.manifests.utility import dataset_get_mod_time
 
@@ -19,6 +19,7 @@ class ManifestStateV2:
     stop_event: Optional[Any] = None
     is_NFS: bool = False
     local_observer: Optional[Any] = None
+    poll_interval: float = POLLER_RATE_INTERVAL
     
     def __post_init__(self):
         if self.is_NFS:
@@ -31,7 +32,7 @@ class ManifestStateV2:
         self.stop_event = Event()
         proc = Process(
             target=dataset_poller_NFS,
-            args=(self.root_path, current_manifest, self.update_queue, self.stop_event),
+            args=(self.root_path, current_manifest, self.update_queue, self.stop_event, self.poll_interval),
             daemon=True,
         )
         proc.start()
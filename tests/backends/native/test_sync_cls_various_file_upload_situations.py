@@ -30,15 +30,20 @@ Here the idea is to test if the NativeSync class handles the upload of files cor
 import os
 import tempfile
 import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
+from pathlib import Path
+from typing import Iterator
 
 import pytest
+from sqlalchemy import delete
 from sqlalchemy.orm import Session
 
 from etiket_client.local.dao.dataset import dao_dataset
 from etiket_client.local.dao.file import dao_file
 from etiket_client.local.models.dataset import DatasetCreate
 from etiket_client.local.models.file import FileCreate
+from etiket_client.local.model import Datasets, DsAttrLink, Files
 
 from etiket_client.remote.endpoints.dataset import dataset_create, dataset_read
 from etiket_client.remote.endpoints.file import (
@@ -62,37 +67,104 @@ from etiket_sync_agent.sync.sync_records.manager import SyncRecordManager
 from etiket_sync_agent.models.sync_items import SyncItems
 
 
-def _create_file(temp_dir: str, filename: str) -> tuple[int, str]:
-    path = os.path.join(temp_dir, filename)
-    with open(path, "w") as f:
-        f.write("test")
-    return os.path.getsize(path), path
+# the collected time has no influence on the sync order, one timestamp is shared by all scenarios
+COLLECTED_TIME = datetime.now()
+FILE_CONTENT = b"test"
 
 
-def _find_file(files: list[FileRead], file_uuid: uuid.UUID, version_id: int) -> FileRead:
-    for f in files:
-        if f.uuid == file_uuid and f.version_id == version_id:
-            return f
-    raise ValueError(f"File {file_uuid} with version {version_id} not found")
+@pytest.fixture(scope="module")
+def native_config() -> NativeConfigData:
+    # the native config has no fields and is not modified by the sync
+    return NativeConfigData()
 
-def test_s1_local_complete_text_remote_dataset_only_uploads_and_secures(
-    session_etiket_client: Session, get_scope_uuid: uuid.UUID):
-    scope_uuid = get_scope_uuid
-    min_last_sync_item = SyncItems(
-        datasetUUID=uuid.uuid4(),
+
+@pytest.fixture(scope="module")
+def uuid_pool() -> Iterator[uuid.UUID]:
+    # one urandom read for all uuids used in this module
+    buffer = os.urandom(16 * 256)
+    return iter([uuid.UUID(bytes=buffer[i:i + 16], version=4) for i in range(0, len(buffer), 16)])
+
+
+@pytest.fixture()
+def min_last_sync_item(uuid_pool: Iterator[uuid.UUID]) -> SyncItems:
+    # taken at the start of each scenario, only datasets created by the scenario are newer
+    return SyncItems(
+        datasetUUID=next(uuid_pool),
         dataIdentifier="initial",
         syncPriority=datetime.now().timestamp(),
     )
+
+
+@pytest.fixture(autouse=True)
+def _clear_local_datasets(session_etiket_client: Session):
+    """
+    Remove the local datasets/files after each scenario, the database itself (and the scope/user
+    records created by the session fixtures) is kept, so no migrations have to be re-run.
+    """
+    yield
+    session_etiket_client.rollback()
+    for table in (Files, DsAttrLink, Datasets):
+        session_etiket_client.execute(delete(table))
+    session_etiket_client.commit()
+
+
+def _create_file(temp_dir: str, filename: str) -> tuple[int, str]:
+    path = Path(temp_dir) / filename
+    path.write_bytes(FILE_CONTENT)
+    return len(FILE_CONTENT), str(path)
+
+
+def _fake_file(temp_dir: str, filename: str) -> tuple[int, str]:
+    # for scenarios where the file must be skipped, reading a missing file during the sync makes the test fail
+    return len(FILE_CONTENT), str(Path(temp_dir) / filename)
+
+
+def _create_remote_dataset_and_file(ds_create: DatasetCreateRemote, f_create: FileCreateRemote) -> None:
+    dataset_create(ds_create)
+    file_create_remote(f_create)
+
+
+def _sync_new_datasets(config: NativeConfigData, last_sync_item: SyncItems, *pending: Future) -> list[SyncItems]:
+    """
+    Detect the new datasets and synchronize them one by one, the pending (remote set up) futures
+    are awaited after the detection, right before the first dataset is synchronized.
+    """
+    sync_items = NativeSync.getNewDatasets(config, last_sync_item)
+    for future in pending:
+        future.result()
+    for sync_item in sync_items:
+        NativeSync.syncDatasetNormal(config, sync_item, SyncRecordManager(sync_item))
+    return sync_items
+
+
+def _index_files(files: list[FileRead]) -> dict[tuple[uuid.UUID, int], FileRead]:
+    return {(f.uuid, f.version_id): f for f in files}
+
+def test_s1_local_complete_text_remote_dataset_only_uploads_and_secures(
+    session_etiket_client: Session, get_scope_uuid: uuid.UUID, min_last_sync_item: SyncItems,
+    native_config: NativeConfigData, uuid_pool: Iterator[uuid.UUID],
+    io_executor: ThreadPoolExecutor):
+    scope_uuid = get_scope_uuid
     with tempfile.TemporaryDirectory() as temp_dir:
-        config = NativeConfigData()
+        ds_uuid = next(uuid_pool)
+
+        # Create remote dataset (no file records yet), runs while the local records are created
+        ds_remote_create = DatasetCreateRemote(
+            uuid=ds_uuid,
+            scope_uuid=scope_uuid,
+            collected=COLLECTED_TIME,
+            name="s1_local",
+            creator="",
+            ranking=0,
+            keywords=[],
+        )
+        remote_setup = io_executor.submit(dataset_create, ds_remote_create)
 
         # Create local dataset and file (complete, unsynchronized, TEXT)
-        ds_uuid = uuid.uuid4()
-        collected_time = datetime.now()
         ds_local = DatasetCreate(
             uuid=ds_uuid,
             scope_uuid=scope_uuid,
-            collected=collected_time,
+            collected=COLLECTED_TIME,
             name="s1_local",
             creator="",
             ranking=0,
@@ -102,14 +174,14 @@ def test_s1_local_complete_text_remote_dataset_only_uploads_and_secures(
         dao_dataset.create(ds_local, session_etiket_client)
 
         size, path = _create_file(temp_dir, "file_s1.txt")
-        file_uuid = uuid.uuid4()
+        file_uuid = next(uuid_pool)
         f_local = FileCreate(
             name="file_s1",
             filename="file_s1.txt",
             uuid=file_uuid,
             version_id=1,
             creator="",
-            collected=datetime.now(),
+            collected=COLLECTED_TIME,
             size=size,
             local_path=path,
             type=FileType.TEXT,
@@ -119,29 +191,18 @@ def test_s1_local_complete_text_remote_dataset_only_uploads_and_secures(
             synchronized=False,
         )
         dao_file.create(f_local, session_etiket_client)
-
-        # Create remote dataset (no file records yet)
-        ds_remote_create = DatasetCreateRemote(
-            uuid=ds_uuid,
-            scope_uuid=scope_uuid,
-            collected=collected_time,
-            name="s1_local",
-            creator="",
-            ranking=0,
-            keywords=[],
-        )
-        dataset_create(ds_remote_create)
+        remote_setup.result()
 
         # Detect and sync
-        sync_items = NativeSync.getNewDatasets(config, min_last_sync_item)
+        sync_items = _sync_new_datasets(native_config, min_last_sync_item)
         assert len(sync_items) == 1
-        sr = SyncRecordManager(sync_items[0])
-        NativeSync.syncDatasetNormal(config, sync_items[0], sr)
 
         # Validate
         ds_local_after = dao_dataset.read(ds_uuid, session_etiket_client)
         ds_remote_after = dataset_read(ds_uuid)
-        rf = _find_file(ds_remote_after.files, file_uuid, 1)
+        remote_files = _index_files(ds_remote_after.files)
+        assert (file_uuid, 1) in remote_files
+        rf = remote_files[(file_uuid, 1)]
         assert rf.status == FileStatusRem.secured
         # local file should be marked synchronized
         assert ds_local_after.files is not None
@@ -150,109 +211,101 @@ def test_s1_local_complete_text_remote_dataset_only_uploads_and_secures(
 
 
 def test_s2_local_complete_text_remote_file_record_exists_uploads_and_secures(
-    session_etiket_client: Session, get_scope_uuid: uuid.UUID
+    session_etiket_client: Session, get_scope_uuid: uuid.UUID, min_last_sync_item: SyncItems,
+    native_config: NativeConfigData,
+    uuid_pool: Iterator[uuid.UUID],
+    io_executor: ThreadPoolExecutor,
 ):
     scope_uuid = get_scope_uuid
-    min_last_sync_item = SyncItems(
-        datasetUUID=uuid.uuid4(),
-        dataIdentifier="initial",
-        syncPriority=datetime.now().timestamp(),
-    )
     with tempfile.TemporaryDirectory() as temp_dir:
-        config = NativeConfigData()
+        ds_uuid = next(uuid_pool)
+        file_uuid = next(uuid_pool)
+        size, path = _create_file(temp_dir, "file_s2.txt")
 
-        # Create local dataset and file (complete, unsynchronized, TEXT)
-        ds_uuid = uuid.uuid4()
-        collected_time = datetime.now()
-        ds_local = DatasetCreate(
+        # Create remote dataset and pre-create remote file record (simulating presigned link requested earlier),
+        # runs while the local records are created
+        ds_remote_create = DatasetCreateRemote(
             uuid=ds_uuid,
             scope_uuid=scope_uuid,
-            collected=collected_time,
+            collected=COLLECTED_TIME,
             name="s2_local",
             creator="",
             ranking=0,
             keywords=[],
-            synchronized=False,
         )
-        dao_dataset.create(ds_local, session_etiket_client)
-
-        size, path = _create_file(temp_dir, "file_s2.txt")
-        file_uuid = uuid.uuid4()
-        f_local = FileCreate(
+        fr_remote = FileCreateRemote(
             name="file_s2",
             filename="file_s2.txt",
             uuid=file_uuid,
-            version_id=1,
             creator="",
-            collected=datetime.now(),
+            collected=COLLECTED_TIME,
             size=size,
-            local_path=path,
             type=FileType.TEXT,
             file_generator="test",
-            status=FileStatusLocal.complete,
+            version_id=1,
             ds_uuid=ds_uuid,
-            synchronized=False,
+            immutable=True,
         )
-        dao_file.create(f_local, session_etiket_client)
+        remote_setup = io_executor.submit(_create_remote_dataset_and_file, ds_remote_create, fr_remote)
 
-        # Create remote dataset and pre-create remote file record (simulating presigned link requested earlier)
-        ds_remote_create = DatasetCreateRemote(
+        # Create local dataset and file (complete, unsynchronized, TEXT)
+        ds_local = DatasetCreate(
             uuid=ds_uuid,
             scope_uuid=scope_uuid,
-            collected=collected_time,
+            collected=COLLECTED_TIME,
             name="s2_local",
             creator="",
             ranking=0,
             keywords=[],
+            synchronized=False,
         )
-        dataset_create(ds_remote_create)
+        dao_dataset.create(ds_local, session_etiket_client)
 
-        fr_remote = FileCreateRemote(
+        f_local = FileCreate(
             name="file_s2",
             filename="file_s2.txt",
             uuid=file_uuid,
+            version_id=1,
             creator="",
-            collected=datetime.now(),
+            collected=COLLECTED_TIME,
             size=size,
+            local_path=path,
             type=FileType.TEXT,
             file_generator="test",
-            version_id=1,
+            status=FileStatusLocal.complete,
             ds_uuid=ds_uuid,
-            immutable=True,
+            synchronized=False,
         )
-        file_create_remote(fr_remote)
-        _ = file_generate_presigned_upload_link_single(file_uuid, 1)
+        dao_file.create(f_local, session_etiket_client)
+        remote_setup.result()
+        # request the presigned link in the background, it only has to be done before the sync starts
+        presign = io_executor.submit(file_generate_presigned_upload_link_single, file_uuid, 1)
 
         # Detect and sync
-        sync_items = NativeSync.getNewDatasets(config, min_last_sync_item)
+        sync_items = _sync_new_datasets(native_config, min_last_sync_item, presign)
         assert len(sync_items) == 1
-        sr = SyncRecordManager(sync_items[0])
-        NativeSync.syncDatasetNormal(config, sync_items[0], sr)
 
         # Validate
         ds_remote_after = dataset_read(ds_uuid)
-        rf = _find_file(ds_remote_after.files, file_uuid, 1)
+        remote_files = _index_files(ds_remote_after.files)
+        assert (file_uuid, 1) in remote_files
+        rf = remote_files[(file_uuid, 1)]
         assert rf.status == FileStatusRem.secured
 
 
 def test_s3_local_hdf5_cache_not_uploaded(
-    session_etiket_client: Session, get_scope_uuid: uuid.UUID
+    session_etiket_client: Session, get_scope_uuid: uuid.UUID, min_last_sync_item: SyncItems,
+    native_config: NativeConfigData,
+    uuid_pool: Iterator[uuid.UUID],
 ):
     scope_uuid = get_scope_uuid
-    min_last_sync_item = SyncItems(
-        datasetUUID=uuid.uuid4(),
-        dataIdentifier="initial",
-        syncPriority=datetime.now().timestamp(),
-    )
     with tempfile.TemporaryDirectory() as temp_dir:
-        config = NativeConfigData()
 
-        ds_uuid = uuid.uuid4()
-        collected_time = datetime.now()
+        ds_uuid = next(uuid_pool)
         ds_local = DatasetCreate(
             uuid=ds_uuid,
             scope_uuid=scope_uuid,
-            collected=collected_time,
+            collected=COLLECTED_TIME,
             name="s3_local",
             creator="",
             ranking=0,
@@ -261,15 +314,15 @@ def test_s3_local_hdf5_cache_not_uploaded(
         )
         dao_dataset.create(ds_local, session_etiket_client)
 
-        size, path = _create_file(temp_dir, "file_s3.h5")
-        file_uuid = uuid.uuid4()
+        size, path = _fake_file(temp_dir, "file_s3.h5")
+        file_uuid = next(uuid_pool)
         f_local = FileCreate(
             name="file_s3",
             filename="file_s3.h5",
             uuid=file_uuid,
             version_id=1,
             creator="",
-            collected=datetime.now(),
+            collected=COLLECTED_TIME,
             size=size,
             local_path=path,
             type=FileType.HDF5_CACHE,
@@ -281,34 +334,27 @@ def test_s3_local_hdf5_cache_not_uploaded(
         dao_file.create(f_local, session_etiket_client)
 
         # Detect and sync (should skip cache file)
-        sync_items = NativeSync.getNewDatasets(config, min_last_sync_item)
+        sync_items = _sync_new_datasets(native_config, min_last_sync_item)
         assert len(sync_items) == 1
-        sr = SyncRecordManager(sync_items[0])
-        NativeSync.syncDatasetNormal(config, sync_items[0], sr)
 
         # Validate remote dataset exists but no such file present
         ds_remote_after = dataset_read(ds_uuid)
-        assert all(not (f.uuid == file_uuid and f.version_id == 1) for f in ds_remote_after.files)
+        assert (file_uuid, 1) not in _index_files(ds_remote_after.files)
 
 
 def test_s4_local_complete_synced_true_hdf5_not_uploaded(
-    session_etiket_client: Session, get_scope_uuid: uuid.UUID
+    session_etiket_client: Session, get_scope_uuid: uuid.UUID, min_last_sync_item: SyncItems,
+    native_config: NativeConfigData,
+    uuid_pool: Iterator[uuid.UUID],
 ):
     scope_uuid = get_scope_uuid
-    min_last_sync_item = SyncItems(
-        datasetUUID=uuid.uuid4(),
-        dataIdentifier="initial",
-        syncPriority=datetime.now().timestamp(),
-    )
     with tempfile.TemporaryDirectory() as temp_dir:
-        config = NativeConfigData()
 
-        ds_uuid = uuid.uuid4()
-        collected_time = datetime.now()
+        ds_uuid = next(uuid_pool)
         ds_local = DatasetCreate(
             uuid=ds_uuid,
             scope_uuid=scope_uuid,
-            collected=collected_time,
+            collected=COLLECTED_TIME,
             name="s4_local",
             creator="",
             ranking=0,
@@ -317,15 +363,15 @@ def test_s4_local_complete_synced_true_hdf5_not_uploaded(
         )
         dao_dataset.create(ds_local, session_etiket_client)
 
-        size, path = _create_file(temp_dir, "file_s4.h5")
-        file_uuid = uuid.uuid4()
+        size, path = _fake_file(temp_dir, "file_s4.h5")
+        file_uuid = next(uuid_pool)
         f_local = FileCreate(
             name="file_s4",
             filename="file_s4.h5",
             uuid=file_uuid,
             version_id=1,
             creator="",
-            collected=datetime.now(),
+            collected=COLLECTED_TIME,
             size=size,
             local_path=path,
             type=FileType.HDF5,
@@ -337,35 +383,28 @@ def test_s4_local_complete_synced_true_hdf5_not_uploaded(
         dao_file.create(f_local, session_etiket_client)
 
         # Detect and sync (should skip already-synchronized file)
-        sync_items = NativeSync.getNewDatasets(config, min_last_sync_item)
+        sync_items = _sync_new_datasets(native_config, min_last_sync_item)
         assert len(sync_items) == 1
-        sr = SyncRecordManager(sync_items[0])
-        NativeSync.syncDatasetNormal(config, sync_items[0], sr)
 
         # Validate remote dataset exists but no such file present
         ds_remote_after = dataset_read(ds_uuid)
-        assert all(not (f.uuid == file_uuid and f.version_id == 1) for f in ds_remote_after.files)
+        assert (file_uuid, 1) not in _index_files(ds_remote_after.files)
 
 
 @pytest.mark.usefixtures()
 def test_s5_local_writing_hdf5_not_uploaded(
-    session_etiket_client: Session, get_scope_uuid: uuid.UUID
+    session_etiket_client: Session, get_scope_uuid: uuid.UUID, min_last_sync_item: SyncItems,
+    native_config: NativeConfigData,
+    uuid_pool: Iterator[uuid.UUID],
 ):
     scope_uuid = get_scope_uuid
-    min_last_sync_item = SyncItems(
-        datasetUUID=uuid.uuid4(),
-        dataIdentifier="initial",
-        syncPriority=datetime.now().timestamp(),
-    )
     with tempfile.TemporaryDirectory() as temp_dir:
-        config = NativeConfigData()
 
-        ds_uuid = uuid.uuid4()
-        collected_time = datetime.now()
+        ds_uuid = next(uuid_pool)
         ds_local = DatasetCreate(
             uuid=ds_uuid,
             scope_uuid=scope_uuid,
-            collected=collected_time,
+            collected=COLLECTED_TIME,
             name="s5_local",
             creator="",
             ranking=0,
@@ -374,15 +413,15 @@ def test_s5_local_writing_hdf5_not_uploaded(
         )
         dao_dataset.create(ds_local, session_etiket_client)
 
-        size, path = _create_file(temp_dir, "file_s5.h5")
-        file_uuid = uuid.uuid4()
+        size, path = _fake_file(temp_dir, "file_s5.h5")
+        file_uuid = next(uuid_pool)
         f_local = FileCreate(
             name="file_s5",
             filename="file_s5.h5",
             uuid=file_uuid,
             version_id=1,
             creator="",
-            collected=datetime.now(),
+            collected=COLLECTED_TIME,
             size=size,
             local_path=path,
             type=FileType.HDF5,
@@ -394,11 +433,9 @@ def test_s5_local_writing_hdf5_not_uploaded(
         dao_file.create(f_local, session_etiket_client)
 
         # Detect and sync (should skip writing status)
-        sync_items = NativeSync.getNewDatasets(config, min_last_sync_item)
+        sync_items = _sync_new_datasets(native_config, min_last_sync_item)
         assert len(sync_items) == 1
-        sr = SyncRecordManager(sync_items[0])
-        NativeSync.syncDatasetNormal(config, sync_items[0], sr)
 
         # Validate remote dataset exists but no such file present
         ds_remote_after = dataset_read(ds_uuid)
-        assert all(not (f.uuid == file_uuid and f.version_id == 1) for f in ds_remote_after.files)
+        assert (file_uuid, 1) not in _index_files(ds_remote_after.files)
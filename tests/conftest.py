@@ -1,27 +1,71 @@
-import pytest, os, tempfile, uuid, datetime
+import pytest, os, shutil, tempfile, uuid, datetime
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, Session
-from typing import Generator, TYPE_CHECKING
+from typing import Generator, Optional, TYPE_CHECKING
 
 if TYPE_CHECKING:
+    from sqlalchemy.engine import Engine
     from sqlalchemy.orm import sessionmaker as SessionMaker
 
+# test databases are thrown away at the end of the session, keep them in RAM when possible
+DB_TEMP_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else None
+# the db urls disable pysqlite's check_same_thread, such that pooled connections can be used from worker threads
+# under pytest-xdist (pytest -n auto) every worker creates its own databases, the worker id is part of the file names
+XDIST_WORKER = os.environ.get("PYTEST_XDIST_WORKER", "main")
+
+# base directory for tmp_path when it is moved to RAM (only set in the process that created it)
+_RAM_BASETEMP: Optional[Path] = None
+
+def pytest_configure(config: pytest.Config):
+    """
+    The poller tests write and stat many small files in tmp_path, put the tmp_path trees in RAM (/dev/shm) as well
+    if enough space is left there. An explicit --basetemp (or the one pytest-xdist passes to its workers) is kept.
+    """
+    global _RAM_BASETEMP
+    if config.option.basetemp is None and DB_TEMP_DIR is not None and shutil.disk_usage(DB_TEMP_DIR).free > 512 * 2**20:
+        _RAM_BASETEMP = Path(tempfile.mkdtemp(prefix="etiket-sync-agent-tests-", dir=DB_TEMP_DIR))
+        config.option.basetemp = str(_RAM_BASETEMP)
+
+def pytest_unconfigure(config: pytest.Config):
+    # pytest does not clean up an explicit basetemp, do not leave anything behind in RAM
+    if _RAM_BASETEMP is not None:
+        shutil.rmtree(_RAM_BASETEMP, ignore_errors=True)
+
+def set_test_pragmas(engine: "Engine", journal_mode: Optional[str] = None):
+    """
+    Skip fsyncs for the throw-away test databases, applied to all connections opened from now on.
+    """
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragma(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA synchronous=OFF")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        if journal_mode is not None:
+            cursor.execute(f"PRAGMA journal_mode={journal_mode}")
+        cursor.close()
+    
+    # drop the connections that were opened by the migrations
+    engine.dispose()
+
 @pytest.fixture(scope="session")
 def db_engine_sessionmaker():
     """Fixture to set up a temporary SQLite database for the test session."""
-    with tempfile.TemporaryDirectory() as temp_dir:
-        db_path = Path(temp_dir) / "test_sync_agent.db"
+    with tempfile.TemporaryDirectory(dir=DB_TEMP_DIR) as temp_dir:
+        db_path = Path(temp_dir) / f"test_sync_agent_{XDIST_WORKER}.db"
         os.environ["SYNC_AGENT_DB_PATH"] = str(db_path)
         
         # remove the db if present
         if db_path.exists():
             db_path.unlink()
             
-        db_url = f"sqlite+pysqlite:///{db_path}"
+        db_url = f"sqlite+pysqlite:///{db_path}?check_same_thread=false"
         
         import etiket_sync_agent.db
         etiket_sync_agent.db.DATABASE_URL = db_url
         etiket_sync_agent.db.load_engine()
+        set_test_pragmas(etiket_sync_agent.db.ENGINE, journal_mode="MEMORY")
         
         yield etiket_sync_agent.db.SESSION_LOCAL
 
@@ -37,13 +81,88 @@ def db_session(db_engine_sessionmaker: "SessionMaker[Session]") -> Generator[Ses
         raise
     finally:
         session.close()
+
+@pytest.fixture(scope="session")
+def db_rollback_engine(db_engine_sessionmaker: "SessionMaker[Session]") -> Generator["Engine", None, None]:
+    """
+    Engine on the test database for transactional tests, pysqlite's own transaction handling is disabled
+    such that SAVEPOINTs are nested in the outer transaction (see the SQLAlchemy pysqlite docs).
+    """
+    import etiket_sync_agent.db
+    engine = create_engine(etiket_sync_agent.db.DATABASE_URL)
+    set_test_pragmas(engine, journal_mode="MEMORY")
+    event.listen(engine, "connect", etiket_sync_agent.db.enable_foreign_keys)
+
+    @event.listens_for(engine, "connect")
+    def _disable_pysqlite_begin(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _emit_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+    yield engine
+    engine.dispose()
+
+@pytest.fixture(scope="function")
+def db_session_rollback(db_rollback_engine: "Engine") -> Generator[Session, None, None]:
+    """
+    Session that runs the test in a single transaction which is rolled back afterwards, commits only release a SAVEPOINT.
+    Only usable for tests that do all their writes through this session.
+    """
+    connection = db_rollback_engine.connect()
+    transaction = connection.begin()
+    # nothing is shared with other sessions, so the instances are not expired (and reloaded) after every commit
+    session = Session(bind=connection, autoflush=False, expire_on_commit=False, join_transaction_mode="create_savepoint")
+    try:
+        yield session
+    finally:
+        session.close()
+        transaction.rollback()
+        connection.close()
+
+@pytest.fixture(scope="module")
+def sync_source_id(db_engine_sessionmaker: "SessionMaker[Session]") -> Generator[int, None, None]:
+    """
+    Creates a SyncSource shared by the tests of a module and deletes it afterwards, the database removes its items (ON DELETE CASCADE).
+    Sync items need an existing source, as foreign keys are enforced.
+    """
+    from sqlalchemy import delete
+    from etiket_sync_agent.models.enums import SyncSourceTypes, SyncSourceStatus
+    from etiket_sync_agent.models.sync_sources import SyncSources
+    
+    with db_engine_sessionmaker() as session:
+        sync_source_data = SyncSources(
+            name = f"test_source_{uuid.uuid4()}",
+            type = SyncSourceTypes.qcodes,
+            status = SyncSourceStatus.PAUSED,
+            creator = "test_user",
+            config_data = {},
+            default_scope = None
+        )
+        session.add(sync_source_data)
+        session.commit()
+        source_id = sync_source_data.id
+    
+    yield source_id
+    
+    with db_engine_sessionmaker() as session:
+        session.execute(delete(SyncSources).where(SyncSources.id == source_id))
+        session.commit()
+
+@pytest.fixture(scope="session")
+def io_executor() -> Generator[ThreadPoolExecutor, None, None]:
+    """Thread pool shared by all tests that run (remote) I/O in parallel."""
+    executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="test-io")
+    yield executor
+    executor.shutdown(wait=True)
         
 @pytest.fixture(scope="session")
 def qcodes_set_up():
     from qcodes.dataset import initialise_or_create_database_at
     
     with tempfile.TemporaryDirectory() as temp_dir:
-        db_path = Path(temp_dir) / "test_qcodes.db"
+        db_path = Path(temp_dir) / f"test_qcodes_{XDIST_WORKER}.db"
         initialise_or_create_database_at(db_path)
         
         yield db_path
@@ -69,20 +188,22 @@ def set_up_etiket_client_db():
     '''
     sets up a temp database for etiket_client.
     '''
-    with tempfile.TemporaryDirectory() as temp_dir:
-        db_path = Path(temp_dir) / "test_etiket_client.db"
+    with tempfile.TemporaryDirectory(dir=DB_TEMP_DIR) as temp_dir:
+        db_path = Path(temp_dir) / f"test_etiket_client_{XDIST_WORKER}.db"
         
         # remove the db if present
         if db_path.exists():
             db_path.unlink()
 
-        db_url = f"sqlite+pysqlite:///{db_path}"
+        db_url = f"sqlite+pysqlite:///{db_path}?check_same_thread=false"
         
         import etiket_client.local.database
         
         etiket_client.local.database.DATABASE_URL = db_url
         from etiket_client.local.database import load_engine
         load_engine()
+        # etiket_client sets WAL mode itself, keep it
+        set_test_pragmas(etiket_client.local.database.ENGINE)
         
         yield
         
@@ -127,12 +248,16 @@ def get_scope_uuid(get_bucket_uuid : uuid.UUID) -> uuid.UUID:
                         bucket_uuid=bucket_uuid)
     scope_create(sc)
     
-    # sync scopes
-    from etiket_client.sync.backends.native.sync_scopes import sync_scopes
+    # add only the new scope to the local db (a full sync_scopes would list all scopes of the user)
+    from etiket_client.local.dao.scope import dao_scope, ScopeCreate as ScopeCreateLocal
     from etiket_client.local.database import get_db_session_context
+    from etiket_client.settings.user_settings import get_user_settings
     
+    scope_r = scope_read(scope_uuid)
     with get_db_session_context() as session:
-        sync_scopes(session)
+        sc_local = ScopeCreateLocal(**scope_r.model_dump(exclude=['is_archived']), archived = scope_r.is_archived)
+        dao_scope.create(sc_local, session)
+        dao_scope.assign_user(scope_uuid, get_user_settings().user_sub, session)
     
     return scope_uuid
 
@@ -0,0 +1,97 @@
+'''
+Tests for the migrations that rebuild tables, run on a database that already contains data.
+
+# test_sync_source_cascade_delete_on_populated_db ::
+-- upgrade a new database to the revision before b7e2d4c1a9f3 and add a source with an item and an error
+-- add an item and an error of a source that does not exist anymore (left behind by the old deletes)
+-- upgrade to b7e2d4c1a9f3, check that only the rows of the removed source are gone and the read_next_item_index is kept
+-- downgrade to the previous revision and upgrade again, check that the rows are kept
+-- delete the source with foreign keys on, check that its item and error are deleted as well
+
+# test_read_next_item_index_replaces_read_item_index ::
+-- upgrade a new database to 3f1c2a7d9b4e, check that read_next_item_index replaced read_item_index (its prefix)
+-- downgrade to the previous revision, check that read_item_index is back
+'''
+import os, uuid
+from pathlib import Path
+
+import pytest
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, event, inspect, text
+
+import etiket_sync_agent
+from etiket_sync_agent.db import enable_foreign_keys
+
+CASCADE_REVISION = 'b7e2d4c1a9f3'
+PREVIOUS_REVISION = '3f1c2a7d9b4e'
+READ_NEXT_ITEM_INDEX_REVISION = '3f1c2a7d9b4e'
+
+@pytest.fixture
+def alembic_cfg(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Config:
+    """Alembic config for a new database in tmp_path (migrations/env.py reads the url from etiket_sync_agent.db)."""
+    monkeypatch.setattr(etiket_sync_agent.db, "DATABASE_URL", f"sqlite+pysqlite:///{tmp_path / 'migrations.db'}")
+    cfg = Config()
+    cfg.set_main_option("script_location", f"{os.path.dirname(etiket_sync_agent.__file__)}/migrations")
+    return cfg
+
+def _count_rows(connection, table_name: str) -> int:
+    return connection.execute(text(f'SELECT count(*) FROM {table_name}')).scalar_one()
+
+def _insert_source_rows(connection, source_id: int, data_identifier: str):
+    connection.execute(text('INSERT INTO sync_items (sync_source_id, "dataIdentifier", "datasetUUID", "syncPriority", synchronized, attempts) '
+                            'VALUES (:source_id, :data_identifier, :dataset_uuid, 1.0, 0, 0)'),
+                        {"source_id": source_id, "data_identifier": data_identifier, "dataset_uuid": uuid.uuid4().hex})
+    connection.execute(text('INSERT INTO sync_source_errors (sync_source_id, sync_iteration, log_exception) VALUES (:source_id, 1, :exception)'),
+                        {"source_id": source_id, "exception": repr(ValueError(data_identifier))})
+
+def test_sync_source_cascade_delete_on_populated_db(alembic_cfg: Config):
+    command.upgrade(alembic_cfg, PREVIOUS_REVISION)
+    
+    engine = create_engine(etiket_sync_agent.db.DATABASE_URL)
+    with engine.begin() as connection:
+        source_id = connection.execute(text('INSERT INTO sync_sources (name, type, status, items_total, items_synchronized, items_failed, config_data) '
+                                            "VALUES ('test_source', 'native', 'PAUSED', 0, 0, 0, '{}') RETURNING id")).scalar_one()
+        _insert_source_rows(connection, source_id, "item_of_source")
+        _insert_source_rows(connection, source_id + 1, "item_of_removed_source")
+    engine.dispose()
+    
+    command.upgrade(alembic_cfg, CASCADE_REVISION)
+    with engine.connect() as connection:
+        assert connection.execute(text('SELECT "dataIdentifier" FROM sync_items')).scalars().all() == ["item_of_source"]
+        assert connection.execute(text('SELECT sync_source_id FROM sync_source_errors')).scalars().all() == [source_id]
+        index_names = {index['name'] for index in inspect(connection).get_indexes('sync_items')}
+        assert 'read_next_item_index' in index_names
+        assert 'read_item_index' not in index_names
+    engine.dispose()
+    
+    command.downgrade(alembic_cfg, PREVIOUS_REVISION)
+    command.upgrade(alembic_cfg, CASCADE_REVISION)
+    
+    event.listen(engine, "connect", enable_foreign_keys)
+    with engine.begin() as connection:
+        assert _count_rows(connection, 'sync_items') == 1
+        assert _count_rows(connection, 'sync_source_errors') == 1
+        connection.execute(text('DELETE FROM sync_sources WHERE id = :source_id'), {"source_id": source_id})
+        assert _count_rows(connection, 'sync_items') == 0
+        assert _count_rows(connection, 'sync_source_errors') == 0
+    engine.dispose()
+
+def _sync_item_index_names() -> set:
+    engine = create_engine(etiket_sync_agent.db.DATABASE_URL)
+    with engine.connect() as connection:
+        index_names = {index['name'] for index in inspect(connection).get_indexes('sync_items')}
+    engine.dispose()
+    return index_names
+
+def test_read_next_item_index_replaces_read_item_index(alembic_cfg: Config):
+    command.upgrade(alembic_cfg, READ_NEXT_ITEM_INDEX_REVISION)
+    index_names = _sync_item_index_names()
+    assert 'read_next_item_index' in index_names
+    assert 'read_item_index' not in index_names
+    
+    command.downgrade(alembic_cfg, '-1')
+    index_names = _sync_item_index_names()
+    assert 'read_item_index' in index_names
+    assert 'read_next_item_index' not in index_names
@@ -1,14 +1,16 @@
 import pytest, uuid
 from datetime import datetime, timedelta, timezone
 
+from sqlalchemy import delete, func, select, update
 from sqlalchemy.orm import Session
-from typing import Generator, List, Dict, Any
+from typing import Generator, List, Dict, Any, Optional, TYPE_CHECKING
 
 from etiket_sync_agent.crud.sync_items import crud_sync_items
 
-from etiket_sync_agent.models.enums import SyncSourceTypes, SyncSourceStatus
 from etiket_sync_agent.models.sync_items import SyncItems
-from etiket_sync_agent.models.sync_sources import SyncSources
+
+if TYPE_CHECKING:
+    from sqlalchemy.orm import sessionmaker as SessionMaker
 
 # Define an example sync item
 example_sync_item: Dict[str, Any] = {
@@ -71,28 +73,10 @@ example_sync_item: Dict[str, Any] = {
 # clean up all items
 
 
-@pytest.fixture(scope="function")
-def sync_source_id(db_session : Session) -> Generator[int, None, None]:
-    """Creates a SyncSource for the test function and deletes it afterwards."""
-    
-    sync_source_data = None
-    try:
-        sync_source_data = SyncSources(
-            name = f"test_source_{uuid.uuid4()}",
-            type = SyncSourceTypes.qcodes,
-            status = SyncSourceStatus.PAUSED,
-            creator = "test_user",
-            config_data = {},
-            default_scope = None
-        )
-        db_session.add(sync_source_data)
-        db_session.commit()
-        db_session.refresh(sync_source_data)
-        yield sync_source_data.id
-    finally:
-        if sync_source_data:
-            db_session.delete(sync_source_data)
-            db_session.commit()
+@pytest.fixture
+def db_session(db_session_rollback: Session) -> Session:
+    """All tests of this module write through their session only, such that they can run in a transaction that is rolled back."""
+    return db_session_rollback
 
 def test_create_sync_item(db_session: Session, sync_source_id: int):
     """Test creating a single sync item."""
@@ -118,285 +102,228 @@ def test_create_sync_item(db_session: Session, sync_source_id: int):
     assert created_item.synchronized is False
     assert created_item.attempts == 0
 
-    # Clean up
-    db_session.delete(created_item)
-    db_session.commit()
-
 # Helper function to clear items for a source
 def _clear_sync_items(session: Session, sync_source_id: int):
-    session.query(SyncItems).filter(SyncItems.sync_source_id == sync_source_id).delete()
+    session.execute(delete(SyncItems).where(SyncItems.sync_source_id == sync_source_id),
+                    execution_options={"synchronize_session": False})
     session.commit()
 
 def test_sync_item_creation_and_update(db_session: Session, sync_source_id: int):
     """Test 1: Create, verify, update on conflict, and clear."""
-    try:
-        # -- provide 1 new item -- check with sql if it is indeed added
-        item1_data = SyncItems(
-            dataIdentifier=f"item_test1_1_{uuid.uuid4()}",
-            syncPriority=1.0,
-            sync_source_id=sync_source_id
-        )
-        crud_sync_items.create_sync_items(db_session, sync_source_id, [item1_data])
-        db_item1 = db_session.query(SyncItems).filter(
-            SyncItems.dataIdentifier == item1_data.dataIdentifier
-        ).first()
-        assert db_item1 is not None
-        assert db_item1.syncPriority == 1.0
-
-        # -- provide 5 new items -- check with sql if they are added
-        items_data = []
-        for i in range(5):
-            items_data.append(SyncItems(
-                dataIdentifier=f"item_test1_multi_{i}_{uuid.uuid4()}",
-                syncPriority=float(i),
-                sync_source_id=sync_source_id
-            ))
-        crud_sync_items.create_sync_items(db_session, sync_source_id, items_data)
-        count = db_session.query(SyncItems).filter(
-            SyncItems.sync_source_id == sync_source_id,
-            SyncItems.dataIdentifier.like("item_test1_multi_%")
-        ).count()
-        assert count == 5
-
-        # in sql set attempts to 1 and set synchronized to True for item1
-        db_item1.attempts = 1
-        db_item1.synchronized = True
-        db_session.add(db_item1)
-        db_session.commit()
-        db_session.refresh(db_item1)
-        assert db_item1.attempts == 1
-        assert db_item1.synchronized is True
-
-        # -- provide 5 new items with same dataIdentifier as item1, but different priority,
-        # check synchronized=False and attempts=0
-        conflict_items = []
-        for i in range(5):
-            conflict_items.append(SyncItems(
-                dataIdentifier=item1_data.dataIdentifier, # Same identifier
-                syncPriority=10.0 + i,
-                sync_source_id=sync_source_id
-            ))
-        crud_sync_items.create_sync_items(db_session, sync_source_id, conflict_items)
-
-        db_session.refresh(db_item1)
-        assert db_item1.synchronized is False
-        assert db_item1.attempts == 0
-        # Priority should be updated to the last one provided (14.0)
-        assert db_item1.syncPriority == 14.0
-
-    finally:
-        # clear all items -- use source id
-        _clear_sync_items(db_session, sync_source_id)
+    # -- provide 1 new item -- check with sql if it is indeed added
+    item1_data = SyncItems(
+        dataIdentifier=f"item_test1_1_{uuid.uuid4()}",
+        syncPriority=1.0,
+        sync_source_id=sync_source_id
+    )
+    crud_sync_items.create_sync_items(db_session, sync_source_id, [item1_data])
+    db_item1 = db_session.query(SyncItems).filter(
+        SyncItems.dataIdentifier == item1_data.dataIdentifier
+    ).first()
+    assert db_item1 is not None
+    assert db_item1.syncPriority == 1.0
+
+    # -- provide 5 new items -- check with sql if they are added
+    run_uuid = uuid.uuid4().hex
+    items_data = [SyncItems(dataIdentifier=f"item_test1_multi_{i}_{run_uuid}", syncPriority=float(i), sync_source_id=sync_source_id)
+                    for i in range(5)]
+    crud_sync_items.create_sync_items(db_session, sync_source_id, items_data)
+    # the identifiers are known, look them up through the unique (sync_source_id, dataIdentifier) index instead of a LIKE scan
+    count = db_session.scalar(select(func.count()).select_from(SyncItems).where(
+        SyncItems.sync_source_id == sync_source_id,
+        SyncItems.dataIdentifier.in_([item.dataIdentifier for item in items_data])))
+    assert count == 5
+
+    # in sql set attempts to 1 and set synchronized to True for item1
+    db_item1.attempts = 1
+    db_item1.synchronized = True
+    db_session.add(db_item1)
+    db_session.commit()
+    assert db_item1.attempts == 1
+    assert db_item1.synchronized is True
+
+    # -- provide 5 new items with same dataIdentifier as item1, but different priority,
+    # check synchronized=False and attempts=0
+    conflict_items = [SyncItems(dataIdentifier=item1_data.dataIdentifier, # Same identifier
+                                    syncPriority=10.0 + i, sync_source_id=sync_source_id)
+                        for i in range(5)]
+    crud_sync_items.create_sync_items(db_session, sync_source_id, conflict_items)
+
+    # the upsert bypasses the ORM, reload only the columns it touched
+    db_session.expire(db_item1, ["syncPriority", "synchronized", "attempts"])
+    assert db_item1.synchronized is False
+    assert db_item1.attempts == 0
+    # Priority should be updated to the last one provided (14.0)
+    assert db_item1.syncPriority == 14.0
 
 
 def test_bulk_insert_sync_items(db_session: Session, sync_source_id: int):
     """Test 2: Test bulk insert (using 1k items instead of 20k for speed)."""
-    try:
-        item_count = 20000
-        bulk_items = []
-        for i in range(item_count):
-            bulk_items.append(SyncItems(
-                dataIdentifier=f"bulk_item_{i}_{uuid.uuid4()}",
-                syncPriority=float(i),
-                sync_source_id=sync_source_id
-            ))
-        
-        crud_sync_items.create_sync_items(db_session, sync_source_id, bulk_items)
-        
-        count = db_session.query(SyncItems).filter(SyncItems.sync_source_id == sync_source_id).count()
-        assert count == item_count
-
-    finally:
-        # clear all items -- use source id
-        _clear_sync_items(db_session, sync_source_id)
+    item_count = 20000
+    run_uuid = uuid.uuid4().hex # identifiers only need to be unique within this test
+    bulk_items = [SyncItems(dataIdentifier=f"bulk_item_{i}_{run_uuid}", syncPriority=float(i), sync_source_id=sync_source_id)
+                    for i in range(item_count)]
+    
+    crud_sync_items.create_sync_items(db_session, sync_source_id, bulk_items)
+    
+    # plain COUNT(*), answered from the (sync_source_id, ...) index without reading the rows
+    count = db_session.scalar(select(func.count()).select_from(SyncItems).where(SyncItems.sync_source_id == sync_source_id))
+    assert count == item_count
+
+
+P2 = "p2_syncF_att0"
+P1 = "p1_syncF_att5"
+P01 = "p0.1_syncF_att1_retry"
+P001 = "p0.01_syncF_att2_retry"
+P0001 = "p0.001_syncF_att0"
+
+# (items marked as synchronized, offset, expected dataIdentifier) -- p10_syncT is always synchronized
+READ_NEXT_CASES = [
+    # 1. highest priority, sync=F, att=0
+    ((), 0, P2),
+    # 2. next highest priority, sync=F, att=0
+    ((), 1, P0001),
+    # --- No more sync=F, att=0 items. Now check retry logic ---
+    # It should prioritize lower attempts first, then higher priority (p1_syncF_att5 is not ready for a retry).
+    # 3. offset 2 because 2 items have attempts=0 & synchronized=False
+    ((), 2, P01),
+    # 4.
+    ((), 3, P001),
+    # 5. priority 2 synchronized -> priority 0.001 is next
+    ((P2,), 0, P0001),
+    # 6. priority 0.001 synchronized, offset resets as no sync=F, att=0 left
+    ((P2, P0001), 0, P01),
+    # 7.
+    ((P2, P0001), 1, P001),
+    # 8. offset past the eligible items
+    ((P2, P0001), 10, None),
+    # 9/10. all synchronized
+    ((P2, P1, P01, P001, P0001), 0, None),
+    ((P2, P1, P01, P001, P0001), 1, None),
+]
+
+@pytest.fixture(scope="class")
+def read_next_items(db_engine_sessionmaker: "SessionMaker[Session]", sync_source_id: int) -> Generator[Dict[str, Dict[str, Any]], None, None]:
+    """Inserts the items once for all cases (committed, such that the rollback of a case keeps them), returns the id per dataIdentifier."""
+    now = datetime.now(timezone.utc)
+    items_to_create = [
+        # - priority 10 - attemps 0 - synchronized True - last_update 1 day ago
+        SyncItems(datasetUUID=uuid.uuid4(), sync_source_id=sync_source_id, dataIdentifier="p10_syncT", 
+                    syncPriority=10.0, attempts=0, synchronized=True, last_update=now - timedelta(days=1)),
+        # - priority 2 - attemps 0 - synchronized False - last_update None
+        SyncItems(datasetUUID=uuid.uuid4(), sync_source_id=sync_source_id, dataIdentifier=P2,
+                    syncPriority=2.0, attempts=0, synchronized=False, last_update=None),
+        # - priority 1 - attemps 5 - synchronized False - last_update 1 hour ago (should not be picked by retry logic yet)
+        SyncItems(datasetUUID=uuid.uuid4(), sync_source_id=sync_source_id, dataIdentifier=P1,
+                    syncPriority=1.0, attempts=5, synchronized=False, last_update=now - timedelta(hours=1)),
+        # - priority 0.1 - attemps 1 - synchronized False - last_update 21 minutes ago (ready for retry)
+        SyncItems(datasetUUID=uuid.uuid4(), sync_source_id=sync_source_id, dataIdentifier=P01,
+                    syncPriority=0.1, attempts=1, synchronized=False, last_update=now - timedelta(minutes=21)),
+        # - priority 0.01 - attemps 2 - synchronized False - last_update 1 hour and 1 minute ago (ready for retry)
+        SyncItems(datasetUUID=uuid.uuid4(), sync_source_id=sync_source_id, dataIdentifier=P001,
+                    syncPriority=0.01, attempts=2, synchronized=False, last_update=now - timedelta(hours=1, minutes=1)),
+        # - priority 0.001 - attemps 0 - synchronized False - last_update None
+        SyncItems(datasetUUID=uuid.uuid4(), sync_source_id=sync_source_id, dataIdentifier=P0001,
+                    syncPriority=0.001, attempts=0, synchronized=False, last_update=None)
+    ]
+    with db_engine_sessionmaker() as session:
+        session.add_all(items_to_create)
+        session.commit()
+        item_ids = {item.dataIdentifier: {"id": item.id} for item in items_to_create}
+    
+    yield item_ids
+    
+    with db_engine_sessionmaker() as session:
+        _clear_sync_items(session, sync_source_id)
 
 
-def test_read_next_sync_item(db_session: Session, sync_source_id: int):
+class TestReadNextSyncItem:
     """Test 3: Test read_next_sync_item logic with various item states."""
-    try:
-        now = datetime.now(timezone.utc)
-        # Manually create items with specific states
-        items_to_create = [
-            # - priority 10 - attemps 0 - synchronized True - last_update 1 day ago
-            SyncItems(datasetUUID=uuid.uuid4(), sync_source_id=sync_source_id, dataIdentifier="p10_syncT", 
-                        syncPriority=10.0, attempts=0, synchronized=True, last_update=now - timedelta(days=1)),
-            # - priority 2 - attemps 0 - synchronized False - last_update None
-            SyncItems(datasetUUID=uuid.uuid4(), sync_source_id=sync_source_id, dataIdentifier="p2_syncF_att0",
-                        syncPriority=2.0, attempts=0, synchronized=False, last_update=None),
-            # - priority 1 - attemps 5 - synchronized False - last_update 1 hour ago (should not be picked by retry logic yet)
-            SyncItems(datasetUUID=uuid.uuid4(), sync_source_id=sync_source_id, dataIdentifier="p1_syncF_att5",
-                        syncPriority=1.0, attempts=5, synchronized=False, last_update=now - timedelta(hours=1)),
-            # - priority 0.1 - attemps 1 - synchronized False - last_update 21 minutes ago (ready for retry)
-            SyncItems(datasetUUID=uuid.uuid4(), sync_source_id=sync_source_id, dataIdentifier="p0.1_syncF_att1_retry",
-                        syncPriority=0.1, attempts=1, synchronized=False, last_update=now - timedelta(minutes=21)),
-            # - priority 0.01 - attemps 2 - synchronized False - last_update 1 hour and 1 minute ago (ready for retry)
-            SyncItems(datasetUUID=uuid.uuid4(), sync_source_id=sync_source_id, dataIdentifier="p0.01_syncF_att2_retry",
-                        syncPriority=0.01, attempts=2, synchronized=False, last_update=now - timedelta(hours=1, minutes=1)),
-            # - priority 0.001 - attemps 0 - synchronized False - last_update None
-            SyncItems(datasetUUID=uuid.uuid4(), sync_source_id=sync_source_id, dataIdentifier="p0.001_syncF_att0",
-                        syncPriority=0.001, attempts=0, synchronized=False, last_update=None)
-        ]
-        db_session.add_all(items_to_create)
-        db_session.commit()
-
-        # Refresh items to get their IDs
-        item_map = {item.dataIdentifier: item for item in db_session.query(SyncItems).filter(SyncItems.sync_source_id == sync_source_id).all()}
-
-        # 1. read next sync item, check if it has priority 2 (highest priority, sync=F, att=0)
-        next_item = crud_sync_items.read_next_sync_item(db_session, sync_source_id, offset=0)
-        assert next_item is not None
-        assert next_item.dataIdentifier == "p2_syncF_att0"
-
-        # 2. read next sync item, with offset 1, check if it has priority 0.001 (next highest P, sync=F, att=0)
-        next_item = crud_sync_items.read_next_sync_item(db_session, sync_source_id, offset=1)
-        assert next_item is not None
-        assert next_item.dataIdentifier == "p0.001_syncF_att0"
-        
-        # --- No more sync=F, att=0 items. Now check retry logic --- 
-        # It should prioritize lower attempts first, then higher priority.
-        # Ready for retry: p0.1_syncF_att1_retry, p0.01_syncF_att2_retry
-        # Expect: p0.1_syncF_att1_retry (att=1) before p0.01_syncF_att2_retry (att=2)
-        
-        # 3. read next sync item (offset 0 from retry), check p0.1_syncF_att1_retry
-        next_item = crud_sync_items.read_next_sync_item(db_session, sync_source_id, offset=2) # Offset 2 because 2 items have attempts=0 & synchronized=False
-        assert next_item is not None
-        assert next_item.dataIdentifier == "p0.1_syncF_att1_retry"
-        
-        # 4. read next sync item (offset 1 from retry), check p0.01_syncF_att2_retry
-        next_item = crud_sync_items.read_next_sync_item(db_session, sync_source_id, offset=3)
-        assert next_item is not None
-        assert next_item.dataIdentifier == "p0.01_syncF_att2_retry"
-
-        # 5. Mark the item with priority 2 as synchronized
-        item_p2 = item_map["p2_syncF_att0"]
-        crud_sync_items.update_sync_item(db_session, sync_item_id=item_p2.id, synchronized=True)
-        db_session.refresh(item_p2)
-        assert item_p2.synchronized is True
-
-        # 6. read next sync item, check if it has priority 0.001 (highest P, sync=F, att=0)
-        next_item = crud_sync_items.read_next_sync_item(db_session, sync_source_id, offset=0)
-        assert next_item is not None
-        assert next_item.dataIdentifier == "p0.001_syncF_att0"
-
-        # 7. Mark the item with priority 0.001 as synchronized
-        item_p0001 = item_map["p0.001_syncF_att0"]
-        crud_sync_items.update_sync_item(db_session, sync_item_id=item_p0001.id, synchronized=True)
-        db_session.refresh(item_p0001)
-        assert item_p0001.synchronized is True
-        
-        # --- No more sync=F, att=0 items. Check retry again --- 
-        # Remaining eligible for retry: p0.1_syncF_att1_retry, p0.01_syncF_att2_retry
-        # Expect: p0.1_syncF_att1_retry (att=1) first.
-
-        # 8. read next sync item (offset 0 for retry), check p0.1_syncF_att1_retry
-        next_item = crud_sync_items.read_next_sync_item(db_session, sync_source_id, offset=0) # Offset resets as no sync=F, att=0 left
-        assert next_item is not None
-        assert next_item.dataIdentifier == "p0.1_syncF_att1_retry"
+    
+    @pytest.mark.parametrize("synchronized_items, offset, expected", READ_NEXT_CASES)
+    def test_read_next_sync_item(self, db_session: Session, sync_source_id: int, read_next_items: Dict[str, Dict[str, Any]],
+                                    synchronized_items: tuple, offset: int, expected: Optional[str]):
+        # the previous case is rolled back, only mark the items of this case. The update also resets last_update
+        # of these items (onupdate), which does not matter as both queries only read items that are not synchronized.
+        if synchronized_items:
+            db_session.execute(update(SyncItems), [
+                {"id": read_next_items[identifier]["id"], "synchronized": True} for identifier in synchronized_items])
+            db_session.commit()
         
-        # 9. read next sync item (offset 1 for retry), check p0.01_syncF_att2_retry
-        next_item = crud_sync_items.read_next_sync_item(db_session, sync_source_id, offset=1)
-        assert next_item is not None
-        assert next_item.dataIdentifier == "p0.01_syncF_att2_retry"
-
-        # 10. read next sync item, with offset 10, check if None is returned
-        next_item = crud_sync_items.read_next_sync_item(db_session, sync_source_id, offset=10)
-        assert next_item is None
-
-        # 11. mark all remaining as synchronized
-        items_to_update = db_session.query(SyncItems).filter(
-            SyncItems.sync_source_id == sync_source_id,
-            SyncItems.synchronized == False
-        ).all()
-        for item in items_to_update:
-            crud_sync_items.update_sync_item(db_session, sync_item_id=item.id, synchronized=True)
-        db_session.commit()
-
-        # 12. read next sync item, check if None is returned
-        next_item = crud_sync_items.read_next_sync_item(db_session, sync_source_id, offset=0)
-        assert next_item is None
-
-    finally:
-        # clear all items
-        _clear_sync_items(db_session, sync_source_id)
+        next_item = crud_sync_items.read_next_sync_item(db_session, sync_source_id, offset=offset)
+        if expected is None:
+            assert next_item is None
+        else:
+            assert next_item is not None
+            assert next_item.dataIdentifier == expected
 
 
 def test_update_sync_item(db_session: Session, sync_source_id: int):
     """Test 4: Update sync item (partial and full)."""
-    try:
-        # Create sync item
-        item_data = SyncItems(
-            dataIdentifier=f"update_item_{uuid.uuid4()}",
-            datasetUUID=uuid.uuid4(),
-            syncPriority=5.0,
-            attempts=0,
-            synchronized=False,
-            sync_source_id=sync_source_id
-        )
-        db_session.add(item_data)
-        db_session.commit()
-        db_session.refresh(item_data)
-        item_id = item_data.id
-
-        # Partial update (priority and attempts)
-        crud_sync_items.update_sync_item(
-            session=db_session,
-            sync_item_id=item_id,
-            sync_priority=6.0,
-            attempts=1
-        )
-        db_session.refresh(item_data)
-        assert item_data.syncPriority == 6.0
-        assert item_data.attempts == 1
-        assert item_data.synchronized is False # Should not change
-
-        # Full update (using available fields in update_sync_item)
-        new_uuid = uuid.uuid4()
-        new_manifest = {"file1": "hash1"}
-        crud_sync_items.update_sync_item(
-            session=db_session,
-            sync_item_id=item_id,
-            dataset_uuid=new_uuid,
-            sync_priority=7.0,
-            attempts=0,
-            sync_record=new_manifest,
-            error="Test Error",
-            traceback="Test Traceback",
-            synchronized=True
-        )
-        db_session.refresh(item_data)
-        assert item_data.datasetUUID == new_uuid
-        assert item_data.syncPriority == 7.0
-        assert item_data.attempts == 0
-        assert item_data.sync_record == new_manifest
-        assert item_data.error == "Test Error"
-        assert item_data.traceback == "Test Traceback"
-        assert item_data.synchronized is True
-
-    finally:
-        # clear all items
-        _clear_sync_items(db_session, sync_source_id)
+    # Create sync item
+    item_data = SyncItems(
+        dataIdentifier=f"update_item_{uuid.uuid4()}",
+        datasetUUID=uuid.uuid4(),
+        syncPriority=5.0,
+        attempts=0,
+        synchronized=False,
+        sync_source_id=sync_source_id
+    )
+    db_session.add(item_data)
+    db_session.commit()
+    item_id = item_data.id
+
+    # Partial update (priority and attempts), the ORM enabled update also sets the attributes of item_data
+    crud_sync_items.update_sync_item(
+        session=db_session,
+        sync_item_id=item_id,
+        sync_priority=6.0,
+        attempts=1
+    )
+    assert item_data.syncPriority == 6.0
+    assert item_data.attempts == 1
+    assert item_data.synchronized is False # Should not change
+
+    # Full update (using available fields in update_sync_item)
+    new_uuid = uuid.uuid4()
+    new_manifest = {"file1": "hash1"}
+    crud_sync_items.update_sync_item(
+        session=db_session,
+        sync_item_id=item_id,
+        dataset_uuid=new_uuid,
+        sync_priority=7.0,
+        attempts=0,
+        sync_record=new_manifest,
+        error="Test Error",
+        traceback="Test Traceback",
+        synchronized=True
+    )
+    # columns that were never loaded on item_data are not synchronized by the update, reload them
+    db_session.expire(item_data, ["sync_record", "error", "traceback"])
+    assert item_data.datasetUUID == new_uuid
+    assert item_data.syncPriority == 7.0
+    assert item_data.attempts == 0
+    assert item_data.sync_record == new_manifest
+    assert item_data.error == "Test Error"
+    assert item_data.traceback == "Test Traceback"
+    assert item_data.synchronized is True
 
 
 def test_get_last_sync_item(db_session: Session, sync_source_id: int):
     """Test 5: Get the last sync item based on highest priority."""
-    try:
-        # Create a list of sync items
-        items_to_create = [
-            SyncItems(datasetUUID=uuid.uuid4(), sync_source_id=sync_source_id, dataIdentifier="p10_syncT", syncPriority=10.0, synchronized=True),
-            SyncItems(datasetUUID=uuid.uuid4(), sync_source_id=sync_source_id, dataIdentifier="p2_syncF", syncPriority=2.0, synchronized=False),
-            SyncItems(datasetUUID=uuid.uuid4(), sync_source_id=sync_source_id, dataIdentifier="p1_syncF", syncPriority=1.0, synchronized=False)
-        ]
-        db_session.add_all(items_to_create)
-        db_session.commit()
-
-        # Get last sync item (should return the one with priority 10)
-        last_item = crud_sync_items.get_last_sync_item(db_session, sync_source_id)
-        assert last_item is not None
-        assert last_item.dataIdentifier == "p10_syncT"
-        assert last_item.syncPriority == 10.0
-
-    finally:
-        # clean up all items
-        _clear_sync_items(db_session, sync_source_id)
+    # Create a list of sync items
+    items_to_create = [
+        SyncItems(datasetUUID=uuid.uuid4(), sync_source_id=sync_source_id, dataIdentifier="p10_syncT", syncPriority=10.0, synchronized=True),
+        SyncItems(datasetUUID=uuid.uuid4(), sync_source_id=sync_source_id, dataIdentifier="p2_syncF", syncPriority=2.0, synchronized=False),
+        SyncItems(datasetUUID=uuid.uuid4(), sync_source_id=sync_source_id, dataIdentifier="p1_syncF", syncPriority=1.0, synchronized=False)
+    ]
+    db_session.add_all(items_to_create)
+    db_session.commit()
+
+    # Get last sync item (should return the one with priority 10)
+    last_item = crud_sync_items.get_last_sync_item(db_session, sync_source_id)
+    assert last_item is not None
+    assert last_item.dataIdentifier == "p10_syncT"
+    assert last_item.syncPriority == 10.0
 
 
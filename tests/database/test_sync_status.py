@@ -1,100 +1,90 @@
 '''
 Unit tests for testing the sync status class.
 
-# test 1 ::
+# test_status_actions (parametrized) ::
 -- get model, check if the status is running
 -- get model again, check in the database, if only one record exists (id should match the prev one)
-
-# test 2 ::
 -- update the status to error and give an example error message
 -- get status and check if this is correct
 -- update the status to running
 -- get status and check if this is correct + check if the last updated time is updated compared to the previous one.
+
+Every test runs in a transaction that is rolled back afterwards (SAVEPOINT per commit), such that each test starts without a status record.
 '''
-import time
+import pytest, time
+
+from datetime import datetime
+from typing import List, Optional, Tuple
 
+from sqlalchemy import func, select, type_coerce
 from sqlalchemy.orm import Session
 
 from etiket_sync_agent.crud.sync_status import crud_sync_status
 from etiket_sync_agent.models.enums import SyncStatus
 from etiket_sync_agent.models.sync_status import SyncStatusRecord
-
-
-def test_get_or_create_status_creates_new_record(db_session: Session):
-    """Test 1: Get model, check if the status is running, verify only one record exists."""
-    # First call should create a new record with RUNNING status
-    status_record = crud_sync_status.get_or_create_status(db_session)
-    
-    assert status_record is not None
-    assert status_record.id is not None
-    assert status_record.status == SyncStatus.RUNNING
-    assert status_record.last_update is not None
-    assert status_record.error_message is None
-    
-    # Store the initial record details
-    first_record_id = status_record.id
-    first_last_update = status_record.last_update
-    
-    # Second call should return the same record (not create a new one)
-    status_record_2 = crud_sync_status.get_or_create_status(db_session)
-    
-    assert status_record_2.id == first_record_id
-    assert status_record_2.status == SyncStatus.RUNNING
-    assert status_record_2.last_update == first_last_update
+from etiket_sync_agent.models.utility.functions import utcnow
+from etiket_sync_agent.models.utility.types import UtcDateTime
+
+DB_NOW = select(type_coerce(utcnow(), UtcDateTime()))
+
+def _wait_for_db_clock(session: Session, previous: datetime):
+    """Polls the database clock (ms resolution) until it is past previous, such that the next update gets a newer last_update."""
+    while session.scalar(DB_NOW) <= previous:
+        time.sleep(0.0002)
+
+
+@pytest.fixture
+def db_session(db_session_rollback: Session) -> Session:
+    """All tests of this module write through their session only, such that they can run in a transaction that is rolled back."""
+    return db_session_rollback
+
+ERROR_MESSAGE = "Test error occurred during sync"
+
+# each case is a list of (action, expected_status, expected_error), 'update' sets the expected status and error
+STATUS_ACTION_CASES = [
+    pytest.param([("get_or_create", SyncStatus.RUNNING, None),
+                  ("get_or_create", SyncStatus.RUNNING, None)],
+                 id="get_or_create_returns_same_record"),
+    pytest.param([("get_or_create", SyncStatus.RUNNING, None),
+                  ("update", SyncStatus.ERROR, ERROR_MESSAGE),
+                  ("get", SyncStatus.ERROR, ERROR_MESSAGE),
+                  ("update", SyncStatus.RUNNING, None),
+                  ("get", SyncStatus.RUNNING, None)],
+                 id="update_to_error_and_back"),
+    pytest.param([("get_or_create", SyncStatus.RUNNING, None),
+                  ("get", SyncStatus.RUNNING, None),
+                  ("update", SyncStatus.ERROR, ERROR_MESSAGE),
+                  ("get", SyncStatus.ERROR, ERROR_MESSAGE),
+                  ("update", SyncStatus.RUNNING, None),
+                  ("get_or_create", SyncStatus.RUNNING, None)],
+                 id="only_one_record_exists"),
+]
+
+@pytest.mark.parametrize("actions", STATUS_ACTION_CASES)
+def test_status_actions(db_session: Session, actions: List[Tuple[str, SyncStatus, Optional[str]]]):
+    """Apply the actions in order, the status record should always be the same one, last_update only changes on updates."""
+    first_record_id = None
+    previous_update_time = None
+    for action, expected_status, expected_error in actions:
+        if action == "update":
+            _wait_for_db_clock(db_session, previous_update_time)
+            record = crud_sync_status.update_status(db_session, expected_status, expected_error)
+            assert record.last_update > previous_update_time
+        else:
+            record = getattr(crud_sync_status, f"{action}_status")(db_session)
+            assert previous_update_time is None or record.last_update == previous_update_time
+        
+        assert record.id is not None
+        assert first_record_id is None or record.id == first_record_id
+        assert record.status == expected_status
+        assert record.error_message == expected_error
+        
+        first_record_id = record.id
+        previous_update_time = record.last_update
     
     # Verify only one record exists in the database
-    all_records = db_session.query(SyncStatusRecord).all()
-    assert len(all_records) == 1
-    assert all_records[0].id == first_record_id
-
-
-def test_update_status_and_verify_changes(db_session: Session):
-    """Test 2: Update status to error with message, then back to running, verify updates."""
-    # Create initial record
-    initial_record = crud_sync_status.get_or_create_status(db_session)
-    initial_last_update = initial_record.last_update
-    
-    # Update status to ERROR with error message
-    error_message = "Test error occurred during sync"
-    updated_record = crud_sync_status.update_status(
-        session=db_session,
-        status=SyncStatus.ERROR,
-        error_message=error_message
-    )
-    
-    # Verify the update
-    assert updated_record.id == initial_record.id  # Same record
-    assert updated_record.status == SyncStatus.ERROR
-    assert updated_record.error_message == error_message
-    assert updated_record.last_update > initial_last_update  # Should be updated
-    
-    # Get status and verify it matches
-    current_status = crud_sync_status.get_status(db_session)
-    assert current_status.id == initial_record.id
-    assert current_status.status == SyncStatus.ERROR
-    assert current_status.error_message == error_message
-    
-    # Store the error state timestamp
-    error_last_update = updated_record.last_update
-    
-    # Update status back to RUNNING
-    running_record = crud_sync_status.update_status(
-        session=db_session,
-        status=SyncStatus.RUNNING
-    )
-    
-    # Verify the update to RUNNING
-    assert running_record.id == initial_record.id  # Same record
-    assert running_record.status == SyncStatus.RUNNING
-    assert running_record.error_message is None  # Should be cleared when not ERROR
-    assert running_record.last_update > error_last_update  # Should be updated again
-    
-    # Final verification with get_status
-    final_status = crud_sync_status.get_status(db_session)
-    assert final_status.id == initial_record.id
-    assert final_status.status == SyncStatus.RUNNING
-    assert final_status.error_message is None
-    assert final_status.last_update == running_record.last_update
+    assert db_session.scalar(select(func.count()).select_from(SyncStatusRecord)) == 1
+    assert db_session.scalar(select(SyncStatusRecord.id)) == first_record_id
 
 
 def test_update_status_preserves_error_message_for_error_status(db_session: Session):
@@ -144,8 +134,8 @@ def test_update_status_clears_error_message_for_non_error_status(db_session: Ses
 
 def test_multiple_status_transitions(db_session: Session):
     """Test multiple status transitions to ensure consistency."""
-    # Create initial record
-    record = crud_sync_status.get_or_create_status(db_session)
+    # Create initial record, in a state that differs from the first transition (a no-op update does not touch last_update)
+    record = crud_sync_status.update_status(db_session, SyncStatus.STOPPED)
     initial_id = record.id
     
     # Test various status transitions
@@ -160,8 +150,8 @@ def test_multiple_status_transitions(db_session: Session):
     
     previous_update_time = record.last_update
     for status, error_msg in transitions:
-        # sleep 3 ms to ensure that the last update time is updated (granularity of 1ms)
-        time.sleep(0.003)
+        # ensure that the last update time is updated (granularity of 1ms)
+        _wait_for_db_clock(db_session, previous_update_time)
         updated_record = crud_sync_status.update_status(
             session=db_session,
             status=status,
@@ -188,26 +178,6 @@ def test_multiple_status_transitions(db_session: Session):
         assert current_status.error_message == updated_record.error_message
 
 
-def test_only_one_status_record_exists(db_session: Session):
-    """Test that only one status record ever exists in the database."""
-    # Create multiple records through different methods
-    record1 = crud_sync_status.get_or_create_status(db_session)
-    record2 = crud_sync_status.get_status(db_session)
-    
-    crud_sync_status.update_status(db_session, SyncStatus.ERROR, "Test error")
-    record3 = crud_sync_status.get_status(db_session)
-    
-    crud_sync_status.update_status(db_session, SyncStatus.RUNNING)
-    record4 = crud_sync_status.get_or_create_status(db_session)
-    
-    # All should be the same record
-    assert record1.id == record2.id == record3.id == record4.id
-    
-    # Verify only one record exists in database
-    all_records = db_session.query(SyncStatusRecord).all()
-    assert len(all_records) == 1
-    assert all_records[0].id == record1.id
-    
 def test_increment_sync_iteration(db_session: Session):
     """Test that the sync iteration count is incremented correctly."""
     # Create initial record
@@ -19,9 +19,9 @@
     --> start doing some updates ( wait 1 second before queue is flushed before)
     --> add a file to ds1 --> wait --> queue should be updated
     --> add a file to level1/ds3 --> wait --> queue should be updated
-    --> add a hidden file to level1/ds3 --> wait --> queue should not be updated
     --> modify a file in ds1 --> wait --> queue should be updated
     --> modify the _QH_dataset_info.yaml file in ds2 --> wait --> queue should be updated
+    --> add a hidden file to level1/ds3 --> wait --> queue should not be updated
 - test handling of multiple pollers:
     --> create the structure in two different folders,
     --> run the poller in two separate processes
@@ -30,53 +30,60 @@
     --> update a file in the first folder --> check if dataset is added in the queue (wait 400ms to ensure the process has time to process the update).
     --> do the same for the second folder
     --> check if the queue is correct in both folders
-- test lazy poller --> create a simple structure with 1000 datasets, and create a filled manifest at start.
-    --> folder structure is root/ds_all/ds1/, root/ds_all/ds2/, ..., root/ds_all/ds1000/
+- test lazy poller --> create a simple structure with 20 datasets (1000 in the slow variant, run with -m slow), and create a filled manifest at start.
+    --> folder structure is root/ds_all/ds1/, root/ds_all/ds2/, ..., root/ds_all/ds20/
     --> wait 1 second. check if queue is empty
-    --> create a new dataset by making a folder (e.g. root/ds_all/ds1001/) with a _QH_dataset_info.yaml file and a data file.
+    --> create a new dataset by making a folder (e.g. root/ds_all/ds21/) with a _QH_dataset_info.yaml file and a data file.
     --> wait 1 second. check if queue is updated with the new dataset.
     --> repeat this 2 times, clearing to queue every time.
-    --> Now try to add a dataset to the root/ds_other/ds001 + qharbor file --> wait 1 second. --> queue should not be updated (as he is not looking in this folder)
+    --> Now try to add a dataset to the root/ds_other/ds001 + qharbor file --> wait up to 1 second, but less than the first full scan takes
+        --> queue should not contain it (as he is not looking in this folder yet)
 '''
 
-import os, time, multiprocessing as mp
+import os, time, queue, pytest, threading, multiprocessing as mp
 from queue import Empty
 
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict
+from typing import Any, Callable, Dict, Iterator, List, Tuple
 
 from etiket_sync_agent.sync.manifests.v2.definitions import QH_DATASET_INFO_FILE
 from etiket_sync_agent.sync.manifests.v2.dataset_poller_NFS import dataset_poller_NFS
 
+from tests.utils.file_tree import touch, write, write_many
+from tests.utils.polling import backoff
+
 
 # --------------------
 # Helper utilities
 # --------------------
 
-def _touch(p: Path) -> None:
-    p.parent.mkdir(parents=True, exist_ok=True)
-    with p.open("a"):
-        os.utime(p, None)
-
-def _write(p: Path, content: str = "x") -> None:
-    p.parent.mkdir(parents=True, exist_ok=True)
-    p.write_text(content)
+def _queue_get(q, timeout: float = 0):
+    return q.get(timeout=timeout) if timeout > 0 else q.get_nowait()
 
 def _drain_queue(q) -> Dict[str, float]:
+    # only drain what is queued now, updates that the poller adds in the meantime are left in the queue
+    try:
+        n_items = q.qsize()
+    except NotImplementedError:  # multiprocessing.Queue on macOS
+        n_items = None
     out: Dict[str, float] = {}
-    while True:
+    n_drained = 0
+    while n_items is None or n_drained < n_items:
         try:
-            k, v = q.get_nowait()
+            k, v = _queue_get(q)
             out[k] = v
+            n_drained += 1
         except Empty:
             break
     return out
 
-def _start_poller(root: Path, manifest, q, stop_event=None):
-    evt = stop_event or mp.Event()
-    p = mp.Process(target=dataset_poller_NFS, args=(root, manifest, q, evt), daemon=True)
-    p.start()
-    return p, evt
+def _quantize_ctime(ctime: float | None) -> int | None:
+    # ctimes are compared in ms, such that a different float rounding (e.g. on NFS) does not make them differ
+    return None if ctime is None else round(ctime * 1000)
+
+def _quantize(manifest: Dict[str, float]) -> Dict[str, int]:
+    return {k: _quantize_ctime(v) for k, v in manifest.items()}
 
 def _manifest_to_plain_dict(manifest) -> Dict[str, float]:
     try:
@@ -85,155 +92,169 @@ def _manifest_to_plain_dict(manifest) -> Dict[str, float]:
     except (AttributeError, TypeError):
         return dict(manifest)
 
-def _wait_for_manifest(manifest, expected: Dict[str, float], timeout: float = 2.0) -> bool:
-    start = time.monotonic()
-    while time.monotonic() - start < timeout:
-        if _manifest_to_plain_dict(manifest) == expected:
+# the pollers scan twice as fast as the default, the wait timeouts below are scaled accordingly
+TEST_POLL_INTERVAL = 0.05
+
+def _wait_for_manifest(manifest, expected: Dict[str, float], timeout: float = 1.0) -> bool:
+    expected_q = _quantize(expected)
+    for delay in backoff(timeout):
+        if _quantize(_manifest_to_plain_dict(manifest)) == expected_q:
+            return True
+        time.sleep(delay)
+    return _quantize(_manifest_to_plain_dict(manifest)) == expected_q
+
+def _wait_for_manifest_key(manifest, key: str, expected_value: float, timeout: float = 0.5) -> bool:
+    # the poller puts the update on the queue before it writes the manifest, it can arrive before the manifest write
+    expected_q = _quantize_ctime(expected_value)
+    for delay in backoff(timeout):
+        if _quantize_ctime(manifest.get(key)) == expected_q:
             return True
-        time.sleep(0.02)
-    return _manifest_to_plain_dict(manifest) == expected
+        time.sleep(delay)
+    return _quantize_ctime(manifest.get(key)) == expected_q
 
-def _wait_for_queue_key(q, key: str, expected_value: float | None = None, timeout: float = 1.2) -> bool:
-    start = time.monotonic()
+def _wait_for_queue_key(q, key: str, expected_value: float | None = None, timeout: float = 0.6) -> bool:
+    expected_q = _quantize_ctime(expected_value)
     seen: Dict[str, float] = {}
-    while time.monotonic() - start < timeout:
+    for delay in backoff(timeout):
         try:
-            k, v = q.get(timeout=0.02)
+            k, v = _queue_get(q, delay)
             seen[k] = v
-            if k == key and (expected_value is None or v == expected_value):
+            if k == key and (expected_value is None or _quantize_ctime(v) == expected_q):
                 return True
         except Empty:
             pass
-    return key in seen and (expected_value is None or seen.get(key) == expected_value)
+    return key in seen and (expected_value is None or _quantize_ctime(seen.get(key)) == expected_q)
 
-def _wait_for_queue_empty(q, timeout: float = 0.8) -> bool:
-    start = time.monotonic()
-    while time.monotonic() - start < timeout:
+def _wait_for_queue_empty(q, timeout: float = 0.4) -> bool:
+    for delay in backoff(timeout):
         if q.empty():
             return True
         try:
-            q.get(timeout=0.02)
+            _queue_get(q, delay)
         except Empty:
             pass
     return q.empty()
 
 def _build_example_tree(root: Path) -> Dict[str, float]:
-    ds1 = root / "ds1"
-    ds2 = root / "ds2"
-    ds3 = root / "level1" / "ds3"
-    ds4 = root / "level1" / "level2" / "ds4"
+    # the manifest entry of a dataset is the ctime of the file written last
+    datasets = [("ds1", "a"), ("ds2", None), ("level1/ds3", "c"), ("level1/level2/ds4", "d")]
+    ctimes = write_many(root, [(f"{ds}/{QH_DATASET_INFO_FILE}", "x") for ds, _ in datasets] +
+                               [(f"{ds}/file1.txt", contents) for ds, contents in datasets if contents is not None])
+    return {ds: ctimes[f"{ds}/file1.txt" if contents is not None else f"{ds}/{QH_DATASET_INFO_FILE}"]
+            for ds, contents in datasets}
 
-    # Create dataset info files
-    for ds in (ds1, ds2, ds3, ds4):
-        _write(ds / QH_DATASET_INFO_FILE)
 
-    # Populate files
-    _write(ds1 / "file1.txt", "a")
-    _write(ds3 / "file1.txt", "c")
-    _write(ds4 / "file1.txt", "d")
+# -------- #
+# Fixtures #
+# -------- #
 
-    expected = {
-        str(ds1.relative_to(root)): os.stat(ds1 / "file1.txt").st_ctime,
-        str(ds2.relative_to(root)): os.stat(ds2 / QH_DATASET_INFO_FILE).st_ctime,
-        str(ds3.relative_to(root)): os.stat(ds3 / "file1.txt").st_ctime,
-        str(ds4.relative_to(root)): os.stat(ds4 / "file1.txt").st_ctime,
-    }
-    return expected
+@pytest.fixture(scope="module")
+def mp_manager():
+    """One manager process for all tests of this module, it serves the shared manifests."""
+    manager = mp.Manager()
+    yield manager
+    manager.shutdown()
+
+@pytest.fixture
+def start_poller() -> Iterator[Callable[..., None]]:
+    """
+    Start dataset_poller_NFS in a separate process (with a multiprocessing.Queue, as the manifest managers use),
+    or in a thread (threaded=True), which is cheaper to start and works on a plain dict and queue.SimpleQueue.
+    All pollers started by a test are stopped at the end of it.
+    """
+    pollers: List[Tuple[Any, Any]] = []
+
+    def _start_poller(root: Path, manifest, q, threaded: bool = False, poll_interval: float = TEST_POLL_INTERVAL) -> None:
+        evt = threading.Event() if threaded else mp.Event()
+        worker_cls = threading.Thread if threaded else mp.Process
+        worker = worker_cls(target=dataset_poller_NFS, args=(root, manifest, q, evt, poll_interval), daemon=True)
+        worker.start()
+        pollers.append((worker, evt))
+
+    yield _start_poller
+
+    for _, evt in pollers:
+        evt.set()
+    for worker, _ in pollers:
+        worker.join(timeout=0.5)
+        if isinstance(worker, mp.Process) and worker.is_alive():
+            worker.kill()
 
 
 # ----- #
 # Tests #
 # ----- #
 
-def test_initial_scan_populates_manifest_and_queue(tmp_path: Path) -> None:
+@pytest.mark.parametrize("threaded", [pytest.param(False, id="process"), pytest.param(True, id="thread")])
+def test_initial_scan_populates_manifest_and_queue(tmp_path: Path, mp_manager, start_poller, threaded: bool) -> None:
     expected = _build_example_tree(tmp_path)
 
-    manager = mp.Manager()
-    current_manifest = manager.dict()
-    update_queue = mp.Queue()
+    current_manifest = {} if threaded else mp_manager.dict()
+    update_queue = queue.SimpleQueue() if threaded else mp.Queue()
 
-    p, evt = _start_poller(tmp_path, current_manifest, update_queue)
+    start_poller(tmp_path, current_manifest, update_queue, threaded)
 
     assert _wait_for_manifest(current_manifest, expected)
-    assert _drain_queue(update_queue) == expected
-    evt.set()
-    p.join(timeout=2)
-    if p.is_alive():
-        p.terminate()
+    assert _quantize(_drain_queue(update_queue)) == _quantize(expected)
 
 
-def test_no_duplicate_updates_without_changes(tmp_path: Path) -> None:
+def test_no_duplicate_updates_without_changes(tmp_path: Path, mp_manager, start_poller) -> None:
     expected = _build_example_tree(tmp_path)
 
-    manager = mp.Manager()
-    current_manifest = manager.dict()
+    current_manifest = mp_manager.dict()
     update_queue = mp.Queue()
 
-    p, evt = _start_poller(tmp_path, current_manifest, update_queue)
+    start_poller(tmp_path, current_manifest, update_queue)
     assert _wait_for_manifest(current_manifest, expected)
     _drain_queue(update_queue)
 
     # Without any changes, the queue should remain empty
     assert _wait_for_queue_empty(update_queue)
-    evt.set()
-    p.join(timeout=2)
-    if p.is_alive():
-        p.terminate()
 
 
-def test_updates_and_hidden_ignored(tmp_path: Path) -> None:
+def test_updates_and_hidden_ignored(tmp_path: Path, mp_manager, start_poller) -> None:
     expected = _build_example_tree(tmp_path)
 
-    manager = mp.Manager()
-    current_manifest = manager.dict()
+    current_manifest = mp_manager.dict()
     update_queue = mp.Queue()
 
-    p, evt = _start_poller(tmp_path, current_manifest, update_queue)
+    start_poller(tmp_path, current_manifest, update_queue)
     assert _wait_for_manifest(current_manifest, expected)
     _drain_queue(update_queue)
 
     # Add a file to ds1
     ds1 = tmp_path / "ds1"
-    _write(ds1 / "new.txt", "z")
-    expected_ctime = os.stat(ds1 / "new.txt").st_ctime
+    expected_ctime = write(ds1 / "new.txt", "z")
     assert _wait_for_queue_key(update_queue, "ds1", expected_ctime)
-    assert current_manifest["ds1"] == expected_ctime
+    assert _wait_for_manifest_key(current_manifest, "ds1", expected_ctime)
     _drain_queue(update_queue)
 
     # Add a file to level1/ds3
     ds3 = tmp_path / "level1" / "ds3"
-    _write(ds3 / "new.txt", "y")
-    expected_ctime = os.stat(ds3 / "new.txt").st_ctime
+    expected_ctime = write(ds3 / "new.txt", "y")
     assert _wait_for_queue_key(update_queue, "level1/ds3", expected_ctime)
-    assert current_manifest["level1/ds3"] == expected_ctime
+    assert _wait_for_manifest_key(current_manifest, "level1/ds3", expected_ctime)
     _drain_queue(update_queue)
 
-    # Add a hidden file to ds3 (should be ignored)
-    _write(ds3 / ".hidden.txt", "ignored")
-    assert _wait_for_queue_empty(update_queue)
-
     # Modify a file in ds1
-    _write(ds1 / "file1.txt", "modified")
-    expected_ctime = os.stat(ds1 / "file1.txt").st_ctime
+    expected_ctime = write(ds1 / "file1.txt", "modified")
     assert _wait_for_queue_key(update_queue, "ds1", expected_ctime)
-    assert current_manifest["ds1"] == expected_ctime
+    assert _wait_for_manifest_key(current_manifest, "ds1", expected_ctime)
     _drain_queue(update_queue)
 
     # Modify the _QH_dataset_info.yaml file in ds2
     ds2 = tmp_path / "ds2"
-    _touch(ds2 / QH_DATASET_INFO_FILE)
-    expected_ctime = os.stat(ds2 / QH_DATASET_INFO_FILE).st_ctime
+    expected_ctime = touch(ds2 / QH_DATASET_INFO_FILE)
     assert _wait_for_queue_key(update_queue, "ds2", expected_ctime)
-    assert current_manifest["ds2"] == expected_ctime
+    assert _wait_for_manifest_key(current_manifest, "ds2", expected_ctime)
     _drain_queue(update_queue)
 
-    evt.set()
-    p.join(timeout=2)
-    if p.is_alive():
-        p.terminate()
+    # Add a hidden file to ds3 (should be ignored), checked last such that one check covers the whole test
+    write(ds3 / ".hidden.txt", "ignored")
+    assert _wait_for_queue_empty(update_queue)
 
 
-def test_multiple_pollers_independent_queues(tmp_path: Path) -> None:
+def test_multiple_pollers_independent_queues(tmp_path: Path, mp_manager, start_poller) -> None:
     root1 = tmp_path / "root1"
     root2 = tmp_path / "root2"
     root1.mkdir()
@@ -242,14 +263,13 @@ def test_multiple_pollers_independent_queues(tmp_path: Path) -> None:
     expected1 = _build_example_tree(root1)
     expected2 = _build_example_tree(root2)
 
-    manager = mp.Manager()
-    manifest1 = manager.dict()
+    manifest1 = mp_manager.dict()
     queue1 = mp.Queue()
-    manifest2 = manager.dict()
+    manifest2 = mp_manager.dict()
     queue2 = mp.Queue()
 
-    p1, e1 = _start_poller(root1, manifest1, queue1)
-    p2, e2 = _start_poller(root2, manifest2, queue2)
+    start_poller(root1, manifest1, queue1)
+    start_poller(root2, manifest2, queue2)
 
     assert _wait_for_manifest(manifest1, expected1)
     assert _wait_for_manifest(manifest2, expected2)
@@ -257,61 +277,57 @@ def test_multiple_pollers_independent_queues(tmp_path: Path) -> None:
     _drain_queue(queue2)
 
     # Update in root1: ds1
-    _write(root1 / "ds1" / "added.txt", "r1")
-    expected_ctime = os.stat(root1 / "ds1" / "added.txt").st_ctime
+    expected_ctime = write(root1 / "ds1" / "added.txt", "r1")
     assert _wait_for_queue_key(queue1, "ds1", expected_ctime)
-    assert manifest1["ds1"] == expected_ctime
+    assert _wait_for_manifest_key(manifest1, "ds1", expected_ctime)
     _drain_queue(queue1)
 
     # Update in root2: level1/ds3
-    _write(root2 / "level1" / "ds3" / "added.txt", "r2")
-    expected_ctime = os.stat(root2 / "level1" / "ds3" / "added.txt").st_ctime
+    expected_ctime = write(root2 / "level1" / "ds3" / "added.txt", "r2")
     assert _wait_for_queue_key(queue2, "level1/ds3", expected_ctime)
-    assert manifest2["level1/ds3"] == expected_ctime
+    assert _wait_for_manifest_key(manifest2, "level1/ds3", expected_ctime)
     _drain_queue(queue2)
-    
-    e1.set(); e2.set()
-    p1.join(timeout=2); p2.join(timeout=2)
-    if p1.is_alive():
-        p1.terminate()
-    if p2.is_alive():
-        p2.terminate()
 
 
-def test_lazy_poller_with_prepopulated_manifest(tmp_path: Path) -> None:
+@pytest.mark.parametrize("num_datasets", [pytest.param(20, id="fast"), pytest.param(1000, id="slow", marks=pytest.mark.slow)])
+def test_lazy_poller_with_prepopulated_manifest(tmp_path: Path, start_poller, io_executor: ThreadPoolExecutor, num_datasets: int) -> None:
     # Build many datasets under ds_all
     ds_all = tmp_path / "ds_all"
-    num_datasets = 100
-    manifest = {}
-    q = mp.Queue()
+    # the poller works on the (large) manifest directly, no copy is pickled to a poller process
+    q = queue.SimpleQueue()
 
-    for i in range(1, num_datasets + 1):
+    # one mkdir per dataset and no re-opening of the files, the ctime is taken when the file was just written
+    def make_ds(i: int) -> Tuple[str, float]:
         ds = ds_all / f"ds{i}"
-        _write(ds / QH_DATASET_INFO_FILE)
-        _write(ds / "file1.txt", f"{i}")
-        rel = str(ds.relative_to(tmp_path))
-        manifest[rel] = os.stat(ds / "file1.txt").st_ctime
+        ds.mkdir()
+        (ds / QH_DATASET_INFO_FILE).write_bytes(b"")
+        data_file = ds / "file1.txt"
+        data_file.write_bytes(str(i).encode())
+        return f"ds_all/ds{i}", os.stat(data_file).st_ctime
+
+    # the datasets are created in parallel, the syscalls release the GIL
+    ds_all.mkdir()
+    manifest = dict(io_executor.map(make_ds, range(1, num_datasets + 1)))
 
     # Start poller with pre-filled manifest; it should not enqueue anything initially
-    p, evt = _start_poller(tmp_path, manifest, q)
+    t_start = time.monotonic()
+    start_poller(tmp_path, manifest, q, threaded=True)
     assert _wait_for_queue_empty(q)
 
     # Create a new dataset next to the most recent one => detected quickly
     ds_new = ds_all / f"ds{num_datasets + 1}"
-    _write(ds_new / QH_DATASET_INFO_FILE)
-    _write(ds_new / "file1.txt", "new")
-    rel_new = str(ds_new.relative_to(tmp_path))
-    expected_ctime = os.stat(ds_new / "file1.txt").st_ctime
+    write(ds_new / QH_DATASET_INFO_FILE)
+    expected_ctime = write(ds_new / "file1.txt", "new")
+    rel_new = f"ds_all/ds{num_datasets + 1}"
     assert _wait_for_queue_key(q, rel_new, expected_ctime)
     _drain_queue(q)
 
-    # Create a dataset in a different subtree; the scan should not get there yet
+    # Create a dataset in a different subtree; the scan should not get there yet.
+    # The root is listed when a full scan starts, ds_other is only seen by the next one. The first full scan visits
+    # num_datasets datasets at one per poll interval, so wait (a fixed time) until just before it can have ended.
     ds_other = tmp_path / "ds_other" / "ds001"
-    _write(ds_other / QH_DATASET_INFO_FILE)
-    _write(ds_other / "file1.txt", "o1")
-    assert _wait_for_queue_empty(q, 1)
-    
-    evt.set()
-    p.join(timeout=2)
-    if p.is_alive():
-        p.terminate()
\ No newline at end of file
+    write(ds_other / QH_DATASET_INFO_FILE)
+    write(ds_other / "file1.txt", "o1")
+    first_scan_end = t_start + num_datasets * TEST_POLL_INTERVAL
+    time.sleep(max(0.0, min(1.0, first_scan_end - TEST_POLL_INTERVAL - time.monotonic())))
+    assert "ds_other/ds001" not in _drain_queue(q)
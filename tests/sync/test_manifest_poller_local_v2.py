@@ -23,9 +23,9 @@ Unit tests for dataset manifest polling and watching (v2).
     --> start doing some updates (queue is flushed before)
     --> add a file to ds1 --> queue should be updated
     --> add a file to level1/ds3 --> queue should be updated
-    --> add a hidden file to level1/ds3 --> queue should not be updated
     --> modify a file in ds1 --> queue should be updated
     --> modify the _QH_dataset_info.yaml file in ds2 --> queue should be updated
+    --> add a hidden file to level1/ds3 --> queue should not be updated
 - test handling of mulitple pollers:
     --> create the structure in two different folders,
     --> run the poller in two seperate threads
@@ -37,7 +37,7 @@ Unit tests for dataset manifest polling and watching (v2).
 
 """
 import os, time
-from queue import Queue, Empty
+from queue import SimpleQueue, Empty
 
 from pathlib import Path
 from typing import Dict
@@ -45,70 +45,69 @@ from typing import Dict
 from etiket_sync_agent.sync.manifests.v2.definitions import QH_DATASET_INFO_FILE
 from etiket_sync_agent.sync.manifests.v2.dataset_puller_local import dataset_poller_local
 
+from tests.utils.file_tree import touch, write, write_many
 
-def _touch(p: Path) -> None:
-    p.parent.mkdir(parents=True, exist_ok=True)
-    with p.open("a"):
-        os.utime(p, None)
 
-def _write(p: Path, content: str = "x") -> None:
-    p.parent.mkdir(parents=True, exist_ok=True)
-    p.write_text(content)
-
-def _drain_queue(q: Queue) -> Dict[str, float]:
+def _drain_queue(q: SimpleQueue) -> Dict[str, float]:
     out: Dict[str, float] = {}
-    while True:
+    while not q.empty():
         try:
             k, v = q.get_nowait()
-            out[k] = v
         except Empty:
             break
+        out[k] = v
     return out
 
-def _wait_for_queue_key(q: Queue, key: str, expected_value: float | None = None, timeout: float = 0.6) -> bool:
-    start = time.monotonic()
+def _wait_for_queue_key(q: SimpleQueue, key: str, expected_value: float | None = None, timeout: float = 0.6) -> bool:
+    """
+    Block on the queue until the update of key arrives (or the deadline), instead of waking up every few ms.
+    The other updates taken from the queue are put back on both exit paths, such that later checks still see them.
+    They are put back behind the updates the poller added in the meantime, so the order of the queue can change.
+    """
+    deadline = time.monotonic() + timeout
+    other_updates = []
     seen: Dict[str, float] = {}
-    while time.monotonic() - start < timeout:
-        try:
-            k, v = q.get(timeout=0.01)
+    try:
+        while (remaining := deadline - time.monotonic()) > 0:
+            try:
+                k, v = q.get(timeout=remaining)
+            except Empty:
+                break
             seen[k] = v
             if k == key and (expected_value is None or v == expected_value):
                 return True
-        except Empty:
-            pass
-    return key in seen and (expected_value is None or seen.get(key) == expected_value)
-
-def _wait_for_queue_empty(q: Queue, timeout: float = 0.5) -> bool:
-    start = time.monotonic()
-    while time.monotonic() - start < timeout:
-        if q.empty():
-            return True
+            other_updates.append((k, v))
+        return key in seen and (expected_value is None or seen.get(key) == expected_value)
+    finally:
+        for update in other_updates:
+            q.put(update)
+
+def _wait_for_queue_empty(q: SimpleQueue, timeout: float = 0.5) -> bool:
+    deadline = time.monotonic() + timeout
+    while not q.empty():
+        if (remaining := deadline - time.monotonic()) <= 0:
+            return False
         try:
-            q.get(timeout=0.01)
+            q.get(timeout=remaining)
         except Empty:
             pass
-    return q.empty()
+    return True
 
 def _build_example_tree(root: Path) -> Dict[str, float]:
-    ds1 = root / "ds1"
-    ds2 = root / "ds2"
-    ds3 = root / "level1" / "ds3"
-    ds4 = root / "level1" / "level2" / "ds4"
-
-    # Create dataset info files
-    for ds in (ds1, ds2, ds3, ds4):
-        _write(ds / QH_DATASET_INFO_FILE)
-
-    # Populate files
-    _write(ds1 / "file1.txt", "a")
-    _write(ds3 / "file1.txt", "c")
-    _write(ds4 / "file1.txt", "d")
+    ctimes = write_many(root, [
+        # Create dataset info files
+        *((f"{ds}/{QH_DATASET_INFO_FILE}", "x") for ds in ("ds1", "ds2", "level1/ds3", "level1/level2/ds4")),
+        # Populate files
+        ("ds1/file1.txt", "a"),
+        ("level1/ds3/file1.txt", "c"),
+        ("level1/level2/ds4/file1.txt", "d"),
+    ])
 
     expected = {
-        str(ds1.relative_to(root)): os.stat(ds1 / "file1.txt").st_ctime,
-        str(ds2.relative_to(root)): os.stat(ds2 / QH_DATASET_INFO_FILE).st_ctime,
-        str(ds3.relative_to(root)): os.stat(ds3 / "file1.txt").st_ctime,
-        str(ds4.relative_to(root)): os.stat(ds4 / "file1.txt").st_ctime,
+        "ds1": ctimes["ds1/file1.txt"],
+        "ds2": ctimes[f"ds2/{QH_DATASET_INFO_FILE}"],
+        "level1/ds3": ctimes["level1/ds3/file1.txt"],
+        "level1/level2/ds4": ctimes["level1/level2/ds4/file1.txt"],
     }
     return expected
 
@@ -117,7 +116,7 @@ def test_initial_scan_without_watcher(tmp_path: Path) -> None:
     expected = _build_example_tree(tmp_path)
 
     current_manifest: Dict[str, float] = {}
-    update_queue: Queue = Queue()
+    update_queue: SimpleQueue = SimpleQueue()
 
     observer = dataset_poller_local(tmp_path, current_manifest, update_queue, enable_watcher=False)
     assert observer is None
@@ -130,7 +129,7 @@ def test_idempotent_rescan(tmp_path: Path) -> None:
     expected = _build_example_tree(tmp_path)
 
     current_manifest: Dict[str, float] = {}
-    update_queue: Queue = Queue()
+    update_queue: SimpleQueue = SimpleQueue()
 
     dataset_poller_local(tmp_path, current_manifest, update_queue, enable_watcher=False)
     # Flush queue and rescan
@@ -145,7 +144,7 @@ def test_watcher_updates_and_hidden_ignored(tmp_path: Path) -> None:
     expected = _build_example_tree(tmp_path)
 
     current_manifest: Dict[str, float] = {}
-    update_queue: Queue = Queue()
+    update_queue: SimpleQueue = SimpleQueue()
 
     observer = dataset_poller_local(tmp_path, current_manifest, update_queue, enable_watcher=True)
     try:
@@ -158,27 +157,20 @@ def test_watcher_updates_and_hidden_ignored(tmp_path: Path) -> None:
 
         # Add a file to ds1
         ds1 = tmp_path / "ds1"
-        _write(ds1 / "new.txt", "z")
-        expected_ctime = os.stat(ds1 / "new.txt").st_ctime
+        expected_ctime = write(ds1 / "new.txt", "z")
         assert _wait_for_queue_key(update_queue, "ds1", expected_ctime)
         assert current_manifest["ds1"] == expected_ctime
         _drain_queue(update_queue)
         
         # Add a file to level1/ds3
         ds3 = tmp_path / "level1" / "ds3"
-        _write(ds3 / "new.txt", "y")
-        expected_ctime = os.stat(ds3 / "new.txt").st_ctime
+        expected_ctime = write(ds3 / "new.txt", "y")
         assert _wait_for_queue_key(update_queue, "level1/ds3", expected_ctime)
         assert current_manifest["level1/ds3"] == expected_ctime
         _drain_queue(update_queue)
 
-        # Add a hidden file to ds3 (should be ignored)
-        _write(ds3 / ".hidden.txt", "ignored")
-        assert _wait_for_queue_empty(update_queue)
-        
         # Modify a file in ds1
-        _write(ds1 / "file1.txt", "modified")
-        expected_ctime = os.stat(ds1 / "file1.txt").st_ctime
+        expected_ctime = write(ds1 / "file1.txt", "modified")
 
         assert _wait_for_queue_key(update_queue, "ds1", expected_ctime)
         assert current_manifest["ds1"] == expected_ctime
@@ -186,11 +178,14 @@ def test_watcher_updates_and_hidden_ignored(tmp_path: Path) -> None:
 
         # Modify the _QH_dataset_info.yaml file in ds2
         ds2 = tmp_path / "ds2"
-        _touch(ds2 / QH_DATASET_INFO_FILE)
-        expected_ctime = os.stat(ds2 / QH_DATASET_INFO_FILE).st_ctime
+        expected_ctime = touch(ds2 / QH_DATASET_INFO_FILE)
         assert _wait_for_queue_key(update_queue, "ds2", expected_ctime)
         assert current_manifest["ds2"] == expected_ctime
         _drain_queue(update_queue)
+
+        # Add a hidden file to ds3 (should be ignored), checked last such that one check covers the whole test
+        write(ds3 / ".hidden.txt", "ignored")
+        assert _wait_for_queue_empty(update_queue)
     finally:
         if observer is not None:
             observer.stop()
@@ -207,9 +202,9 @@ def test_multiple_pollers_independent_queues(tmp_path: Path) -> None:
     expected2 = _build_example_tree(root2)
 
     manifest1: Dict[str, float] = {}
-    queue1: Queue = Queue()
+    queue1: SimpleQueue = SimpleQueue()
     manifest2: Dict[str, float] = {}
-    queue2: Queue = Queue()
+    queue2: SimpleQueue = SimpleQueue()
 
     obs1 = dataset_poller_local(root1, manifest1, queue1, enable_watcher=True)
     obs2 = dataset_poller_local(root2, manifest2, queue2, enable_watcher=True)
@@ -220,15 +215,13 @@ def test_multiple_pollers_independent_queues(tmp_path: Path) -> None:
         _drain_queue(queue2)
 
         # Update in root1: ds1
-        _write(root1 / "ds1" / "added.txt", "r1")
-        expected_ctime = os.stat(root1 / "ds1" / "added.txt").st_ctime
+        expected_ctime = write(root1 / "ds1" / "added.txt", "r1")
         assert _wait_for_queue_key(queue1, "ds1", expected_ctime)
         assert manifest1["ds1"] == expected_ctime
         _drain_queue(queue1)
         
         # Update in root2: level1/ds3
-        _write(root2 / "level1" / "ds3" / "added.txt", "r2")
-        expected_ctime = os.stat(root2 / "level1" / "ds3" / "added.txt").st_ctime
+        expected_ctime = write(root2 / "level1" / "ds3" / "added.txt", "r2")
         assert _wait_for_queue_key(queue2, "level1/ds3", expected_ctime)
         assert manifest2["level1/ds3"] == expected_ctime
         _drain_queue(queue2)
@@ -245,7 +238,7 @@ def test_watcher_move_event_updates_manifest(tmp_path: Path) -> None:
     expected = _build_example_tree(tmp_path)
 
     current_manifest: Dict[str, float] = {}
-    update_queue: Queue = Queue()
+    update_queue: SimpleQueue = SimpleQueue()
 
     observer = dataset_poller_local(tmp_path, current_manifest, update_queue, enable_watcher=True)
     try:
@@ -273,7 +266,7 @@ def test_new_dataset_creation_detected_by_watcher(tmp_path: Path) -> None:
     expected = _build_example_tree(tmp_path)
 
     current_manifest: Dict[str, float] = {}
-    update_queue: Queue = Queue()
+    update_queue: SimpleQueue = SimpleQueue()
 
     observer = dataset_poller_local(tmp_path, current_manifest, update_queue, enable_watcher=True)
     try:
@@ -282,11 +275,10 @@ def test_new_dataset_creation_detected_by_watcher(tmp_path: Path) -> None:
 
         # Create new dataset ds5 with info file and a data file
         ds5 = tmp_path / "level1" / "level2" / "ds5"
-        _write(ds5 / QH_DATASET_INFO_FILE)
-        _write(ds5 / "file1.txt", "n1")
+        write(ds5 / QH_DATASET_INFO_FILE)
+        expected_ctime = write(ds5 / "file1.txt", "n1")
 
-        rel = str(ds5.relative_to(tmp_path))
-        expected_ctime = os.stat(ds5 / "file1.txt").st_ctime
+        rel = "level1/level2/ds5"
         assert _wait_for_queue_key(update_queue, rel, expected_ctime)
         assert current_manifest[rel] == expected_ctime
     finally:
@@ -299,7 +291,7 @@ def test_new_dataset_creation_detected_on_rescan(tmp_path: Path) -> None:
     expected = _build_example_tree(tmp_path)
 
     current_manifest: Dict[str, float] = {}
-    update_queue: Queue = Queue()
+    update_queue: SimpleQueue = SimpleQueue()
 
     # Initial scan without watcher
     dataset_poller_local(tmp_path, current_manifest, update_queue, enable_watcher=False)
@@ -308,14 +300,14 @@ def test_new_dataset_creation_detected_on_rescan(tmp_path: Path) -> None:
 
     # Create new dataset ds5
     ds5 = tmp_path / "ds5"
-    _write(ds5 / QH_DATASET_INFO_FILE)
-    _write(ds5 / "file1.txt", "n1")
+    write(ds5 / QH_DATASET_INFO_FILE)
+    expected_ctime = write(ds5 / "file1.txt", "n1")
 
     # Rescan to pick up ds5
     dataset_poller_local(tmp_path, current_manifest, update_queue, enable_watcher=False)
 
-    rel = str(ds5.relative_to(tmp_path))
+    rel = "ds5"
     drained = _drain_queue(update_queue)
     assert rel in drained
-    assert drained[rel] == os.stat(ds5 / "file1.txt").st_ctime
-    assert current_manifest[rel] == os.stat(ds5 / "file1.txt").st_ctime
+    assert drained[rel] == expected_ctime
+    assert current_manifest[rel] == expected_ctime
@@ -34,6 +34,9 @@ A dataset remote is present with the same alt_uid as the syncItem.
 
 import pytest, uuid, datetime
 
+from typing import Any, Dict, List
+from sqlalchemy.orm import Session
+
 from etiket_client.local.models.dataset import DatasetCreate as DatasetCreateLocal
 from etiket_client.local.dao.dataset import dao_dataset
 from etiket_client.local.exceptions import DatasetNotFoundException
@@ -45,24 +48,16 @@ from etiket_sync_agent.sync.sync_utilities import sync_utilities, dataset_info
 from etiket_sync_agent.models.sync_items import SyncItems
 from etiket_sync_agent.sync.sync_records.manager import SyncRecordManager
 
-def test_case_1_dataset_not_present_locally_nor_remotely(
-    session_etiket_client, 
-    get_scope_uuid
-):
-    """
-    Case 1: Dataset is not present locally, nor on the remote server.
-    --> run the function and check if the dataset is created on the remote server, though not locally.
-    """
-    # Arrange
-    dataset_uuid = uuid.uuid4()
-    scope_uuid = get_scope_uuid
-    alt_uid = f"test_alt_uid_{uuid.uuid4()}"
-    
-    # Create a sync item
-    sync_item = SyncItems(
-        id=1,
-        sync_source_id=1,
-        dataIdentifier="test_data_identifier",
+# all datasets use the same collection time, it is not compared by the sync
+COLLECTED = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+LOCAL_ATTRIBUTES = {"local_attr": "local_value"}
+REMOTE_ATTRIBUTES = {"remote_attr": "remote_value"}
+
+def _make_sync_item(item_id: int, sync_source_id: int, dataset_uuid: uuid.UUID, data_identifier: str) -> SyncItems:
+    return SyncItems(
+        id=item_id,
+        sync_source_id=sync_source_id,
+        dataIdentifier=data_identifier,
         datasetUUID=dataset_uuid,
         syncPriority=1.0,
         synchronized=False,
@@ -71,410 +66,183 @@ def test_case_1_dataset_not_present_locally_nor_remotely(
         error=None,
         traceback=None
     )
-    
-    # Create dataset info
-    ds_info = dataset_info(
-        name="Test Dataset Case 1",
+
+def _make_ds_info(case: int, dataset_uuid: uuid.UUID, scope_uuid: uuid.UUID, alt_uid: str, attributes: Dict[str, str]) -> dataset_info:
+    """Dataset info to sync, with an additional keyword and attribute compared to the pre-existing datasets."""
+    return dataset_info(
+        name=f"Test Dataset Case {case} Updated",
         datasetUUID=dataset_uuid,
         scopeUUID=scope_uuid,
-        created=datetime.datetime.now(),
+        created=COLLECTED,
         alt_uid=alt_uid,
-        description="Test dataset for case 1",
-        keywords=["test", "case1"],
-        attributes={"test_attr": "test_value"},
-        ranking=1,
+        description=f"Test dataset for case {case} - updated version",
+        keywords=["test", f"case{case}", "updated"],  # additional keyword
+        attributes={**attributes, "additional_attr": "additional_value"},  # additional attribute
+        ranking=2,
         creator="test_user"
     )
-    
-    sync_record = SyncRecordManager(sync_item=sync_item, dataset_path=None)
-    
-    sync_utilities.create_or_update_dataset(
-        live_mode=False,
-        s_item=sync_item,
-        ds_info=ds_info,
-        sync_record=sync_record
-    )
-    
-    # Assert
-    remote_dataset = dataset_read(dataset_uuid)
-    assert remote_dataset is not None
-    assert remote_dataset.uuid == dataset_uuid
-    assert remote_dataset.name == ds_info.name
-    assert remote_dataset.alt_uid == ds_info.alt_uid
-    assert remote_dataset.description == ds_info.description
-    assert set(remote_dataset.keywords) == set(ds_info.keywords)
-    assert remote_dataset.attributes == ds_info.attributes
-    assert remote_dataset.ranking == ds_info.ranking
-    assert remote_dataset.creator == ds_info.creator
-    assert remote_dataset.scope.uuid == scope_uuid
-    
-    # Check that dataset was NOT created locally (live_mode=False)
-    with pytest.raises(DatasetNotFoundException):
-        dao_dataset.read(dataset_uuid, session=session_etiket_client)
-    
-    # veryify that entries have been added to the log of the sync_record
-    sync_record_dict = sync_record.to_dict()
-    logs = sync_record_dict['logs']
-    assert len(logs) == 1
-    task = logs[0]
-    assert "Creating or updating dataset on remote server" in task['name']
-    assert len(task['content']) == 1
-    log_items = task['content']
-    assert "Dataset record created on remote server" in log_items[0]['message']
 
-def test_case_2_dataset_present_locally_not_remotely(
-    session_etiket_client, 
-    get_scope_uuid,
-    db_session
-):
-    """
-    Case 2: Dataset is present locally, but not on the remote server.
-    --> run the function and check if the dataset is created on the remote server, and locally updated.
-    --> the dataset to be uploaded to the server should contain an additional attribute and keyword.
-    """
-    # Arrange
-    dataset_uuid = uuid.uuid4()
-    scope_uuid = get_scope_uuid
-    alt_uid = f"test_alt_uid_{uuid.uuid4()}"
-    
-    # Create dataset locally first
+def _expected_fields(ds_info: dataset_info, dataset_uuid: uuid.UUID) -> Dict[str, Any]:
+    """Expected fields of the synced dataset, the keywords as a set as they are compared regardless of their order."""
+    return {"uuid": dataset_uuid, "name": ds_info.name, "alt_uid": ds_info.alt_uid, "description": ds_info.description,
+            "keywords": frozenset(ds_info.keywords), "attributes": ds_info.attributes, "ranking": ds_info.ranking,
+            "creator": ds_info.creator}
+
+def _assert_dataset_matches(dataset, expected: Dict[str, Any]):
+    assert dataset is not None
+    for field, value in expected.items():
+        actual = frozenset(dataset.keywords) if field == "keywords" else getattr(dataset, field)
+        assert actual == value, f"dataset {field} is {actual!r}, expected {value!r}"
+
+def _create_local_dataset(session: Session, case: int, dataset_uuid: uuid.UUID, scope_uuid: uuid.UUID, alt_uid: str):
     local_dataset_create = DatasetCreateLocal(
         uuid=dataset_uuid,
         alt_uid=alt_uid,
-        name="Test Dataset Case 2 Local",
-        description="Test dataset for case 2 - local version",
-        keywords=["test", "case2", "local"],
-        attributes={"local_attr": "local_value"},
+        name=f"Test Dataset Case {case} Local",
+        description=f"Test dataset for case {case} - local version",
+        keywords=["test", f"case{case}", "local"],
+        attributes=LOCAL_ATTRIBUTES,
         ranking=1,
         creator="test_user",
         scope_uuid=scope_uuid,
-        collected=datetime.datetime.now()
+        collected=COLLECTED
     )
-    
-    with session_etiket_client as session:
+    with session:
         dao_dataset.create(local_dataset_create, session=session)
-    
-    # Create a sync item
-    sync_item = SyncItems(
-        id=98,
-        sync_source_id=1,
-        dataIdentifier="test_data_identifier_case2",
-        datasetUUID=dataset_uuid,
-        syncPriority=1.0,
-        synchronized=False,
-        attempts=0,
-        sync_record={},
-        error=None,
-        traceback=None
-    )
-    with db_session as session:
-        session.add(sync_item)
-        session.commit()
-        session.refresh(sync_item)
-    
-    # Create dataset info with additional attribute and keyword
-    ds_info = dataset_info(
-        name="Test Dataset Case 2 Updated",
-        datasetUUID=dataset_uuid,
-        scopeUUID=scope_uuid,
-        created=datetime.datetime.now(),
-        alt_uid=alt_uid,
-        description="Test dataset for case 2 - updated version",
-        keywords=["test", "case2", "updated"],  # additional keyword
-        attributes={"local_attr": "local_value", "additional_attr": "additional_value"},  # additional attribute
-        ranking=2,
-        creator="test_user"
-    )
-    
-    sync_record = SyncRecordManager(sync_item=sync_item, dataset_path=None)
-    
-    # Act
-    sync_utilities.create_or_update_dataset(
-        live_mode=True,
-        s_item=sync_item,
-        ds_info=ds_info,
-        sync_record=sync_record
-    )
-    
-    # Assert
-    # Check remote dataset was created
-    remote_dataset = dataset_read(dataset_uuid)
-    assert remote_dataset is not None
-    assert remote_dataset.uuid == dataset_uuid
-    assert remote_dataset.name == ds_info.name
-    assert remote_dataset.alt_uid == ds_info.alt_uid
-    assert remote_dataset.description == ds_info.description
-    assert set(remote_dataset.keywords) == set(ds_info.keywords)
-    assert remote_dataset.attributes == ds_info.attributes
-    assert remote_dataset.ranking == ds_info.ranking
-    assert remote_dataset.creator == ds_info.creator
-    assert remote_dataset.scope.uuid == scope_uuid
-    
-    # Check local dataset was updated
-    with session_etiket_client as session:
-        local_dataset = dao_dataset.read(dataset_uuid, session=session)
-        assert local_dataset is not None
-        assert local_dataset.uuid == dataset_uuid
-        assert local_dataset.name == ds_info.name
-        assert local_dataset.alt_uid == ds_info.alt_uid
-        assert local_dataset.description == ds_info.description
-        assert set(local_dataset.keywords) == set(ds_info.keywords)
-        assert local_dataset.attributes == ds_info.attributes
-        assert local_dataset.ranking == ds_info.ranking
-        assert local_dataset.creator == ds_info.creator
-    
-    # Verify that entries have been added to the log of the dataset_manifest
-    sync_record_dict = sync_record.to_dict()
-    logs = sync_record_dict['logs']
-    assert len(logs) == 1
-    task = logs[0]
-    assert "Creating or updating dataset on remote server" in task['name']
-    assert len(task['content']) == 3
-    log_items = task['content']
-    assert "Dataset record created on remote server" in log_items[0]['message']
-    assert "Dataset record found on local server (Live Dataset)." in log_items[1]['message']
-    assert "Dataset record updated on local server" in log_items[2]['message']
 
-def test_case_3_dataset_present_remotely_not_locally(
-    session_etiket_client, 
-    get_scope_uuid
-):
-    """
-    Case 3: Dataset is present on the remote server, but not locally.
-    --> run the function and check if the dataset is created locally, and the remote dataset is updated correctly.
-    --> the dataset to be uploaded has an additional attribute and keyword.
-    """
-    # Arrange
-    dataset_uuid = uuid.uuid4()
-    scope_uuid = get_scope_uuid
-    alt_uid = f"test_alt_uid_{uuid.uuid4()}"
-    
-    # Create dataset remotely first
+def _create_remote_dataset(case: int, dataset_uuid: uuid.UUID, scope_uuid: uuid.UUID, alt_uid: str):
     remote_dataset_create = DatasetCreateRemote(
         uuid=dataset_uuid,
         alt_uid=alt_uid,
-        name="Test Dataset Case 3 Remote",
-        description="Test dataset for case 3 - remote version",
-        keywords=["test", "case3", "remote"],
-        attributes={"remote_attr": "remote_value"},
+        name=f"Test Dataset Case {case} Remote",
+        description=f"Test dataset for case {case} - remote version",
+        keywords=["test", f"case{case}", "remote"],
+        attributes=REMOTE_ATTRIBUTES,
         ranking=1,
         creator="test_user",
         scope_uuid=scope_uuid,
-        collected=datetime.datetime.now()
+        collected=COLLECTED
     )
-    
     dataset_create(remote_dataset_create)
-    
-    # Create a sync item
-    sync_item = SyncItems(
-        id=3,
-        sync_source_id=1,
-        dataIdentifier="test_data_identifier_case3",
-        datasetUUID=dataset_uuid,
-        syncPriority=1.0,
-        synchronized=False,
-        attempts=0,
-        sync_record={},
-        error=None,
-        traceback=None
-    )
-    
-    # Create dataset info with additional attribute and keyword
-    ds_info = dataset_info(
-        name="Test Dataset Case 3 Updated",
-        datasetUUID=dataset_uuid,
-        scopeUUID=scope_uuid,
-        created=datetime.datetime.now(),
-        alt_uid=alt_uid,
-        description="Test dataset for case 3 - updated version",
-        keywords=["test", "case3", "updated"],  # additional keyword
-        attributes={"remote_attr": "remote_value", "additional_attr": "additional_value"},  # additional attribute
-        ranking=2,
-        creator="test_user"
-    )
-    
-    sync_record = SyncRecordManager(sync_item=sync_item, dataset_path=None)
-    
-    # Act
-    sync_utilities.create_or_update_dataset(
-        live_mode=True,
-        s_item=sync_item,
-        ds_info=ds_info,
-        sync_record=sync_record
-    )
-    
-    # Assert
-    # Check remote dataset was updated
-    remote_dataset = dataset_read(dataset_uuid)
-    assert remote_dataset is not None
-    assert remote_dataset.uuid == dataset_uuid
-    assert remote_dataset.name == ds_info.name
-    assert remote_dataset.alt_uid == ds_info.alt_uid
-    assert remote_dataset.description == ds_info.description
-    assert set(remote_dataset.keywords) == set(ds_info.keywords)
-    # Note: attributes should be merged, so both original and additional should be present
-    expected_attributes = {"remote_attr": "remote_value", "additional_attr": "additional_value"}
-    assert remote_dataset.attributes == expected_attributes
-    assert remote_dataset.ranking == ds_info.ranking
-    assert remote_dataset.creator == ds_info.creator
-    assert remote_dataset.scope.uuid == scope_uuid
-    
-    # Check local dataset was created
-    with session_etiket_client as session:
-        local_dataset = dao_dataset.read(dataset_uuid, session=session)
-        assert local_dataset is not None
-        assert local_dataset.uuid == dataset_uuid
-        assert local_dataset.name == ds_info.name
-        assert local_dataset.alt_uid == ds_info.alt_uid
-        assert local_dataset.description == ds_info.description
-        assert set(local_dataset.keywords) == set(ds_info.keywords)
-        assert local_dataset.attributes == ds_info.attributes
-        assert local_dataset.ranking == ds_info.ranking
-        assert local_dataset.creator == ds_info.creator
-    
-    # Verify that entries have been added to the log of the dataset_manifest
-    sync_record_dict = sync_record.to_dict()
-    logs = sync_record_dict['logs']
 
-    assert len(logs) == 1
-    task = logs[0]
-    assert "Creating or updating dataset on remote server" in task['name']
-    assert len(task['content']) == 4
-    log_items = task['content']
-    assert "Dataset record found on remote server" in log_items[0]['message']
-    assert "Dataset record updated on remote server" in log_items[1]['message']
-    assert "Dataset record created on local server" in log_items[2]['message']
-    assert "Dataset record found on local server, no update needed" in log_items[3]['message']
+# sync items that have to be present in the sync agent database, by id
+PERSISTED_SYNC_ITEMS = {98: "test_data_identifier_case2", 100: "test_data_identifier_case5", 101: "test_data_identifier_case6"}
 
-def test_case_4_dataset_present_locally_and_remotely(
-    session_etiket_client, 
-    get_scope_uuid
+@pytest.fixture(scope="module")
+def preloaded_sync_items(db_engine_sessionmaker, sync_source_id: int) -> Dict[int, SyncItems]:
+    """
+    Insert the sync items of all tests in one go, each test syncs a dataset with the uuid of its item.
+    The items are removed together with their sync source at the end of the module.
+    """
+    items = {item_id: _make_sync_item(item_id, sync_source_id, uuid.uuid4(), data_identifier) for item_id, data_identifier in PERSISTED_SYNC_ITEMS.items()}
+    with db_engine_sessionmaker() as session:
+        session.bulk_save_objects(list(items.values()))
+        session.commit()
+    return items
+
+# (case, sync item id, present locally, present remotely, live mode, expected log messages of the task)
+CREATE_OR_UPDATE_CASES = [
+    pytest.param(1, 1, False, False, False,
+                 ["Dataset record created on remote server"],
+                 id="case_1_dataset_not_present_locally_nor_remotely"),
+    pytest.param(2, 98, True, False, True,
+                 ["Dataset record created on remote server",
+                  "Dataset record found on local server (Live Dataset).",
+                  "Dataset record updated on local server"],
+                 id="case_2_dataset_present_locally_not_remotely"),
+    pytest.param(3, 3, False, True, True,
+                 ["Dataset record found on remote server",
+                  "Dataset record updated on remote server",
+                  "Dataset record created on local server",
+                  "Dataset record found on local server, no update needed"],
+                 id="case_3_dataset_present_remotely_not_locally"),
+    pytest.param(4, 4, True, True, True,
+                 ["Dataset record found on remote server (by uuid)",
+                  "Dataset record updated on remote server",
+                  "Dataset record found on local server (Live Dataset).",
+                  "Dataset record updated on local server"],
+                 id="case_4_dataset_present_locally_and_remotely"),
+]
+
+@pytest.mark.parametrize("case, item_id, present_locally, present_remotely, live_mode, expected_logs", CREATE_OR_UPDATE_CASES)
+def test_create_or_update_dataset(
+    session_etiket_client,
+    get_scope_uuid,
+    preloaded_sync_items,
+    sync_source_id,
+    io_executor,
+    case: int,
+    item_id: int,
+    present_locally: bool,
+    present_remotely: bool,
+    live_mode: bool,
+    expected_logs: List[str]
 ):
     """
-    Case 4: Dataset is present locally and on the remote server.
-    --> run the function and check if the dataset is updated on the remote server.
-    --> the dataset to be uploaded to the server should contain an additional attribute and keyword.
+    Cases 1-4: the dataset is present locally and/or on the remote server, or at neither place.
+    --> run the function and check that the remote dataset is created or updated, and the local one when in live mode.
+    --> the dataset to be uploaded contains an additional attribute and keyword.
     """
     # Arrange
-    dataset_uuid = uuid.uuid4()
+    if item_id in preloaded_sync_items:
+        sync_item = preloaded_sync_items[item_id]
+    else:
+        sync_item = _make_sync_item(item_id, sync_source_id, uuid.uuid4(), f"test_data_identifier_case{case}")
+    dataset_uuid = sync_item.datasetUUID
     scope_uuid = get_scope_uuid
     alt_uid = f"test_alt_uid_{uuid.uuid4()}"
     
-    # Create dataset locally first
-    local_dataset_create = DatasetCreateLocal(
-        uuid=dataset_uuid,
-        alt_uid=alt_uid,
-        name="Test Dataset Case 4 Local",
-        description="Test dataset for case 4 - local version",
-        keywords=["test", "case4", "local"],
-        attributes={"local_attr": "local_value"},
-        ranking=1,
-        creator="test_user",
-        scope_uuid=scope_uuid,
-        collected=datetime.datetime.now()
-    )
+    # the remote and local records are independent, create the remote one while the local one is written
+    remote_created = io_executor.submit(_create_remote_dataset, case, dataset_uuid, scope_uuid, alt_uid) if present_remotely else None
+    if present_locally:
+        _create_local_dataset(session_etiket_client, case, dataset_uuid, scope_uuid, alt_uid)
+    if remote_created is not None:
+        remote_created.result()
     
-    with session_etiket_client as session:
-        dao_dataset.create(local_dataset_create, session=session)
-    
-    # Create dataset remotely first
-    remote_dataset_create = DatasetCreateRemote(
-        uuid=dataset_uuid,
-        alt_uid=alt_uid,
-        name="Test Dataset Case 4 Remote",
-        description="Test dataset for case 4 - remote version",
-        keywords=["test", "case4", "remote"],
-        attributes={"remote_attr": "remote_value"},
-        ranking=1,
-        creator="test_user",
-        scope_uuid=scope_uuid,
-        collected=datetime.datetime.now()
-    )
-    
-    dataset_create(remote_dataset_create)
-    
-    # Create a sync item
-    sync_item = SyncItems(
-        id=4,
-        sync_source_id=1,
-        dataIdentifier="test_data_identifier_case4",
-        datasetUUID=dataset_uuid,
-        syncPriority=1.0,
-        synchronized=False,
-        attempts=0,
-        sync_record={},
-        error=None,
-        traceback=None
-    )
-    
-    # Create dataset info with additional attribute and keyword
-    ds_info = dataset_info(
-        name="Test Dataset Case 4 Updated",
-        datasetUUID=dataset_uuid,
-        scopeUUID=scope_uuid,
-        created=datetime.datetime.now(),
-        alt_uid=alt_uid,
-        description="Test dataset for case 4 - updated version",
-        keywords=["test", "case4", "updated"],  # additional keyword
-        attributes={"local_attr": "local_value", "remote_attr": "remote_value", "additional_attr": "additional_value"},  # additional attribute
-        ranking=2,
-        creator="test_user"
-    )
+    # the attributes of the pre-existing datasets are kept
+    attributes = {**(LOCAL_ATTRIBUTES if present_locally else {}), **(REMOTE_ATTRIBUTES if present_remotely else {})}
+    ds_info = _make_ds_info(case, dataset_uuid, scope_uuid, alt_uid, attributes)
     
     sync_record = SyncRecordManager(sync_item=sync_item, dataset_path=None)
+    expected = _expected_fields(ds_info, dataset_uuid)
     
     # Act
     sync_utilities.create_or_update_dataset(
-        live_mode=True,
+        live_mode=live_mode,
         s_item=sync_item,
         ds_info=ds_info,
         sync_record=sync_record
     )
     
     # Assert
-    # Check remote dataset was updated
+    # Check remote dataset was created or updated
     remote_dataset = dataset_read(dataset_uuid)
-    assert remote_dataset is not None
-    assert remote_dataset.uuid == dataset_uuid
-    assert remote_dataset.name == ds_info.name
-    assert remote_dataset.alt_uid == ds_info.alt_uid
-    assert remote_dataset.description == ds_info.description
-    assert set(remote_dataset.keywords) == set(ds_info.keywords)
-    assert remote_dataset.attributes == ds_info.attributes
-    assert remote_dataset.ranking == ds_info.ranking
-    assert remote_dataset.creator == ds_info.creator
+    _assert_dataset_matches(remote_dataset, expected)
     assert remote_dataset.scope.uuid == scope_uuid
     
-    # Check local dataset was updated
-    with session_etiket_client as session:
-        local_dataset = dao_dataset.read(dataset_uuid, session=session)
-        assert local_dataset is not None
-        assert local_dataset.uuid == dataset_uuid
-        assert local_dataset.name == ds_info.name
-        assert local_dataset.alt_uid == ds_info.alt_uid
-        assert local_dataset.description == ds_info.description
-        assert set(local_dataset.keywords) == set(ds_info.keywords)
-        assert local_dataset.attributes == ds_info.attributes
-        assert local_dataset.ranking == ds_info.ranking
-        assert local_dataset.creator == ds_info.creator
+    if not live_mode:
+        # Check that dataset was NOT created locally
+        with pytest.raises(DatasetNotFoundException):
+            dao_dataset.read(dataset_uuid, session=session_etiket_client)
+    else:
+        # Check local dataset was created or updated
+        with session_etiket_client as session:
+            local_dataset = dao_dataset.read(dataset_uuid, session=session)
+            _assert_dataset_matches(local_dataset, expected)
     
-    # Verify that entries have been added to the log of the dataset_manifest
+    # Verify that entries have been added to the log of the sync_record
     sync_record_dict = sync_record.to_dict()
     logs = sync_record_dict['logs']
-    print(logs)
     assert len(logs) == 1
     task = logs[0]
     assert "Creating or updating dataset on remote server" in task['name']
-    assert len(task['content']) == 4
-    log_items = task['content']
-    assert "Dataset record found on remote server (by uuid)" in log_items[0]['message']
-    assert "Dataset record updated on remote server" in log_items[1]['message']
-    assert "Dataset record found on local server (Live Dataset)." in log_items[2]['message']
-    assert "Dataset record updated on local server" in log_items[3]['message']
+    assert len(task['content']) == len(expected_logs)
+    for log_item, expected_message in zip(task['content'], expected_logs):
+        assert expected_message in log_item['message']
 
 def test_case_5_local_dataset_with_same_alt_uid(
     session_etiket_client,
-    db_session,
+    preloaded_sync_items,
     get_scope_uuid
 ):
     """
@@ -483,60 +251,20 @@ def test_case_5_local_dataset_with_same_alt_uid(
     """
     # Arrange
     existing_dataset_uuid = uuid.uuid4()
-    sync_item_uuid = uuid.uuid4()  # Different UUID for sync item
+    # the sync item has a different UUID, but the same alt_uid
+    sync_item = preloaded_sync_items[100]
+    sync_item_uuid = sync_item.datasetUUID
     scope_uuid = get_scope_uuid
     alt_uid = f"test_alt_uid_{uuid.uuid4()}"
     
     # Create dataset locally first with existing_dataset_uuid
-    local_dataset_create = DatasetCreateLocal(
-        uuid=existing_dataset_uuid,
-        alt_uid=alt_uid,
-        name="Test Dataset Case 5 Local",
-        description="Test dataset for case 5 - local version",
-        keywords=["test", "case5", "local"],
-        attributes={"local_attr": "local_value"},
-        ranking=1,
-        creator="test_user",
-        scope_uuid=scope_uuid,
-        collected=datetime.datetime.now()
-    )
-    
-    with session_etiket_client as session:
-        dao_dataset.create(local_dataset_create, session=session)
-    
-    # Create a sync item with different UUID but same alt_uid
-    with db_session as session:
-        sync_item = SyncItems(
-            id=100,
-            sync_source_id=1,
-            dataIdentifier="test_data_identifier_case5",
-            datasetUUID=sync_item_uuid,  # Different UUID
-            syncPriority=1.0,
-            synchronized=False,
-            attempts=0,
-            sync_record={},
-            error=None,
-            traceback=None
-        )
-        session.add(sync_item)
-        session.commit()
-        session.refresh(sync_item)
+    _create_local_dataset(session_etiket_client, 5, existing_dataset_uuid, scope_uuid, alt_uid)
     
-    # Create dataset info with sync_item_uuid but same alt_uid
-    ds_info = dataset_info(
-        name="Test Dataset Case 5 Updated",
-        datasetUUID=sync_item_uuid,  # This should get updated to existing_dataset_uuid
-        scopeUUID=scope_uuid,
-        created=datetime.datetime.now(),
-        alt_uid=alt_uid,  # Same alt_uid as existing local dataset
-        description="Test dataset for case 5 - updated version",
-        keywords=["test", "case5", "updated"],  # additional keyword
-        attributes={"local_attr": "local_value", "additional_attr": "additional_value"},  # additional attribute
-        ranking=2,
-        creator="test_user"
-    )
+    # Create dataset info with sync_item_uuid (this should get updated to existing_dataset_uuid) but the same alt_uid
+    ds_info = _make_ds_info(5, sync_item_uuid, scope_uuid, alt_uid, LOCAL_ATTRIBUTES)
     
     sync_record = SyncRecordManager(sync_item=sync_item, dataset_path=None)
+    expected = _expected_fields(ds_info, existing_dataset_uuid)
     
     # Act
     sync_utilities.create_or_update_dataset(
@@ -549,24 +277,13 @@ def test_case_5_local_dataset_with_same_alt_uid(
     # Assert
     # Check remote dataset was created with existing_dataset_uuid (not sync_item_uuid)
     remote_dataset = dataset_read(existing_dataset_uuid)
-    assert remote_dataset is not None
-    assert remote_dataset.uuid == existing_dataset_uuid
-    assert remote_dataset.name == ds_info.name
-    assert remote_dataset.alt_uid == ds_info.alt_uid
-    assert remote_dataset.description == ds_info.description
-    assert set(remote_dataset.keywords) == set(ds_info.keywords)
-    assert remote_dataset.attributes == ds_info.attributes
-    assert remote_dataset.ranking == ds_info.ranking
-    assert remote_dataset.creator == ds_info.creator
+    _assert_dataset_matches(remote_dataset, expected)
     assert remote_dataset.scope.uuid == scope_uuid
     
     # Check local dataset with existing_dataset_uuid still exists and was updated
     with session_etiket_client as session:
         local_dataset = dao_dataset.read(existing_dataset_uuid, session=session)
-        assert local_dataset is not None
-        assert local_dataset.uuid == existing_dataset_uuid
-        assert local_dataset.name == ds_info.name
-        assert local_dataset.alt_uid == ds_info.alt_uid
+        _assert_dataset_matches(local_dataset, {field: expected[field] for field in ("uuid", "name", "alt_uid")})
     
     # Verify that entries have been added to the log of the dataset_manifest
     sync_record_dict = sync_record.to_dict()
@@ -584,7 +301,7 @@ def test_case_5_local_dataset_with_same_alt_uid(
 def test_case_6_remote_dataset_with_same_alt_uid(
     session_etiket_client, 
     get_scope_uuid,
-    db_session
+    preloaded_sync_items
 ):
     """
     Case 6: A dataset remote is present with the same alt_uid as the syncItem.
@@ -592,59 +309,22 @@ def test_case_6_remote_dataset_with_same_alt_uid(
     """
     # Arrange
     existing_dataset_uuid = uuid.uuid4()
-    sync_item_uuid = uuid.uuid4()  # Different UUID for sync item
+    # the sync item has a different UUID, but the same alt_uid
+    sync_item = preloaded_sync_items[101]
+    sync_item_uuid = sync_item.datasetUUID
     scope_uuid = get_scope_uuid
     alt_uid = f"test_alt_uid_{uuid.uuid4()}"
     
     # Create dataset remotely first with existing_dataset_uuid
-    remote_dataset_create = DatasetCreateRemote(
-        uuid=existing_dataset_uuid,
-        alt_uid=alt_uid,
-        name="Test Dataset Case 6 Remote",
-        description="Test dataset for case 6 - remote version",
-        keywords=["test", "case6", "remote"],
-        attributes={"remote_attr": "remote_value"},
-        ranking=1,
-        creator="test_user",
-        scope_uuid=scope_uuid,
-        collected=datetime.datetime.now()
-    )
+    _create_remote_dataset(6, existing_dataset_uuid, scope_uuid, alt_uid)
     
-    dataset_create(remote_dataset_create)
-    
-    # Create a sync item with different UUID but same alt_uid
-    sync_item = SyncItems(
-        id=101,
-        sync_source_id=1,
-        dataIdentifier="test_data_identifier_case6",
-        datasetUUID=sync_item_uuid,  # Different UUID
-        syncPriority=1.0,
-        synchronized=False,
-        attempts=0,
-        sync_record={},
-        error=None,
-        traceback=None
-    )
-    with db_session as session:
-        session.add(sync_item)
-        session.commit()
-        session.refresh(sync_item)
-    
-    # Create dataset info with sync_item_uuid but same alt_uid
-    ds_info = dataset_info(
-        name="Test Dataset Case 6 Updated",
-        datasetUUID=sync_item_uuid,  # This should get updated to existing_dataset_uuid
-        scopeUUID=scope_uuid,
-        created=datetime.datetime.now(),
-        alt_uid=alt_uid,  # Same alt_uid as existing remote dataset
-        description="Test dataset for case 6 - updated version",
-        keywords=["test", "case6", "updated"],  # additional keyword
-        attributes={"remote_attr": "remote_value", "additional_attr": "additional_value"},  # additional attribute
-        ranking=2,
-        creator="test_user"
-    )
+    # Create dataset info with sync_item_uuid (this should get updated to existing_dataset_uuid) but the same alt_uid
+    ds_info = _make_ds_info(6, sync_item_uuid, scope_uuid, alt_uid, REMOTE_ATTRIBUTES)
     
     sync_record = SyncRecordManager(sync_item=sync_item, dataset_path=None)
+    expected = _expected_fields(ds_info, existing_dataset_uuid)
+    # the attributes are merged with the ones of the remote dataset
+    expected["attributes"] = {"remote_attr": "remote_value", "additional_attr": "additional_value"}
     
     # Act
     sync_utilities.create_or_update_dataset(
@@ -659,26 +339,13 @@ def test_case_6_remote_dataset_with_same_alt_uid(
     # and updated the sync item's UUID to match the existing dataset
     # So we should check the existing_dataset_uuid, not sync_item_uuid
     remote_dataset = dataset_read(existing_dataset_uuid)
-    assert remote_dataset is not None
-    assert remote_dataset.uuid == existing_dataset_uuid
-    assert remote_dataset.name == ds_info.name
-    assert remote_dataset.alt_uid == ds_info.alt_uid
-    assert remote_dataset.description == ds_info.description
-    assert set(remote_dataset.keywords) == set(ds_info.keywords)
-    # Attributes should be merged
-    expected_attributes = {"remote_attr": "remote_value", "additional_attr": "additional_value"}
-    assert remote_dataset.attributes == expected_attributes
-    assert remote_dataset.ranking == ds_info.ranking
-    assert remote_dataset.creator == ds_info.creator
+    _assert_dataset_matches(remote_dataset, expected)
     assert remote_dataset.scope.uuid == scope_uuid
     
     # Check local dataset was created with the existing_dataset_uuid
     with session_etiket_client as session:
         local_dataset = dao_dataset.read(existing_dataset_uuid, session=session)
-        assert local_dataset is not None
-        assert local_dataset.uuid == existing_dataset_uuid
-        assert local_dataset.name == ds_info.name
-        assert local_dataset.alt_uid == ds_info.alt_uid
+        _assert_dataset_matches(local_dataset, {field: expected[field] for field in ("uuid", "name", "alt_uid")})
     
     # Check that sync_item_uuid dataset was NOT created locally
     with pytest.raises(DatasetNotFoundException):
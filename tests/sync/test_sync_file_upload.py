@@ -327,7 +327,8 @@ def test_file_upload_case_1(
     session_etiket_client,
     get_scope_uuid,
     is_hdf5,
-    db_session
+    db_session,
+    sync_source_id
 ):
     """Test file upload scenarios for Case 1"""
     test_case = CASE_1_TESTS[case_id]
@@ -400,7 +401,7 @@ def test_file_upload_case_1(
         # Create sync item
         sync_item = SyncItems(
             id=case_id*2 + int(is_hdf5),
-            sync_source_id=1,
+            sync_source_id=sync_source_id,
             dataIdentifier=f"test_data_identifier_case_{case_id}_{'hdf5' if is_hdf5 else 'json'}",
             datasetUUID=dataset_uuid,
             syncPriority=1.0,
@@ -733,7 +734,8 @@ def test_file_upload_case_2_dual(
     session_etiket_client,
     get_scope_uuid,
     is_hdf5,
-    db_session
+    db_session,
+    sync_source_id
 ):
     """Test file upload scenarios for Case 2 - dual version scenarios"""
     test_case = CASE_1_TESTS_DUAL[case_id]
@@ -832,7 +834,7 @@ def test_file_upload_case_2_dual(
         # Create sync item
         sync_item = SyncItems(
             id=case_id*2 + int(is_hdf5) + 1000,  # Offset to avoid conflicts with single case tests
-            sync_source_id=1,
+            sync_source_id=sync_source_id,
             dataIdentifier=f"test_data_identifier_case2_{case_id}_{'hdf5' if is_hdf5 else 'json'}",
             datasetUUID=dataset_uuid,
             syncPriority=1.0,
@@ -1,12 +1,18 @@
 import time
 import threading
+import uuid
 from typing import Any
 from unittest.mock import patch, MagicMock, call
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
+from etiket_sync_agent.crud.sync_items import crud_sync_items
+from etiket_sync_agent.crud.sync_sources import crud_sync_sources
 from etiket_sync_agent.crud.sync_status import crud_sync_status
-from etiket_sync_agent.models.enums import SyncStatus
-from etiket_sync_agent.run import sync_loop
+from etiket_sync_agent.models.enums import SyncStatus, SyncSourceStatus, SyncSourceTypes
+from etiket_sync_agent.models.sync_items import SyncItems
+from etiket_sync_agent.models.sync_sources import SyncSources, SyncSourceErrors
+from etiket_sync_agent.run import sync_loop, run_sync_iter
 
 
 '''
@@ -17,6 +23,10 @@ TEST 1: checking sync status reporting
 1.3: simulate a connection error (e.g using the sync_scopes function), check if this is correctly reported in the status
 1.4: ensure that the user is logged out, check that this error get caught. When logging the user in again, check that the sync is resumed.
 
+TEST 2: sync iterations
+
+2.1: delete a sync source while its new items are being added, check that the source is skipped without logging an error for it.
+
 '''
 
 
@@ -154,4 +164,35 @@ def test_sync_loop_running_status_does_something(db_session: Session, session_et
         # Verify the status was updated to RUNNING during the sync process
         # (The sync_loop should call crud_sync_status.update_status with RUNNING)
         final_status = crud_sync_status.get_status(db_session)
-        assert final_status.status == SyncStatus.RUNNING
\ No newline at end of file
+        assert final_status.status == SyncStatus.RUNNING
+
+
+def test_run_sync_iter_skips_source_deleted_during_iteration(db_session: Session, db_engine_sessionmaker):
+    """
+    Test 2.1: A source that is deleted while the iteration runs is skipped, storing its new items fails (foreign keys),
+    this should neither escape the iteration nor try to log an error for the deleted source.
+    """
+    source = SyncSources(name=f"test_deleted_source_{uuid.uuid4()}", type=SyncSourceTypes.native,
+                            status=SyncSourceStatus.SYNCHRONIZING, config_data={})
+    db_session.add(source)
+    db_session.commit()
+    source_id = source.id
+    
+    def delete_source_then_add_items(sync_source, sync_cls, sync_config, session_sync):
+        with db_engine_sessionmaker() as other_session:
+            crud_sync_sources.delete_sync_source(other_session, sync_source.id)
+        crud_sync_items.create_sync_items(session_sync, sync_source.id,
+                                            [SyncItems(dataIdentifier="item_of_deleted_source", datasetUUID=None, syncPriority=1.0)])
+    
+    with patch.object(crud_sync_sources, 'list_sync_sources', return_value=[source]), \
+            patch('etiket_sync_agent.run.get_source_sync_class'), \
+            patch('etiket_sync_agent.run.get_new_sync_items', side_effect=delete_source_then_add_items) as mock_get_new_sync_items, \
+            patch('etiket_sync_agent.run.get_next_sync_item') as mock_get_next_sync_item, \
+            patch('time.sleep'):
+        run_sync_iter(db_session, MagicMock(), sync_iteration=1)
+    
+    mock_get_new_sync_items.assert_called_once()
+    mock_get_next_sync_item.assert_not_called()
+    assert db_session.get(SyncSources, source_id) is None
+    n_errors = db_session.scalar(select(func.count()).select_from(SyncSourceErrors).where(SyncSourceErrors.sync_source_id == source_id))
+    assert n_errors == 0
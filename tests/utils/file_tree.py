@@ -0,0 +1,35 @@
+'''
+Helpers to write the file trees watched by the manifest pollers.
+
+The pollers track the ctime of the files, which cannot be set explicitly (utime only sets atime/mtime),
+hence the helpers return the ctime of the file they changed, taken from the open file descriptor.
+'''
+import os
+
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+def touch(p: Path) -> float:
+    """Touch the file and return its new ctime."""
+    p.parent.mkdir(parents=True, exist_ok=True)
+    with p.open("a") as f:
+        os.utime(f.fileno() if os.utime in os.supports_fd else p, None)
+        return os.fstat(f.fileno()).st_ctime
+
+def write_file(p: Path, content: str) -> float:
+    """Write the file (its directory has to exist) and return its new ctime."""
+    with p.open("w") as f:
+        f.write(content)
+        f.flush()
+        return os.fstat(f.fileno()).st_ctime
+
+def write(p: Path, content: str = "x") -> float:
+    """Write the file and return its new ctime."""
+    p.parent.mkdir(parents=True, exist_ok=True)
+    return write_file(p, content)
+
+def write_many(root: Path, spec: List[Tuple[str, str]]) -> Dict[str, float]:
+    """Write the (relative path, content) files of spec, creating every directory once, returns the ctime per relative path."""
+    for rel_dir in sorted({os.path.dirname(rel_path) for rel_path, _ in spec}):
+        os.makedirs(root / rel_dir, exist_ok=True)
+    return {rel_path: write_file(root / rel_path, content) for rel_path, content in spec}
@@ -0,0 +1,18 @@
+'''
+Polling helpers for tests that wait on background workers (e.g. the manifest pollers).
+'''
+import time
+
+from typing import Iterator
+
+# polls start at 1 ms and back off to 20 ms, such that a fast worker is not waited for longer than needed
+POLL_DELAY_START = 0.001
+POLL_DELAY_MAX = 0.02
+
+def backoff(timeout: float) -> Iterator[float]:
+    """Yield exponentially growing poll delays (clipped to the time left) until the timeout has passed."""
+    deadline = time.monotonic() + timeout
+    delay = POLL_DELAY_START
+    while (remaining := deadline - time.monotonic()) > 0:
+        yield min(delay, remaining)
+        delay = min(delay * 1.5, POLL_DELAY_MAX)